@@ -1,13 +1,7 @@
 #!/usr/bin/env python
-import sys
 import pathlib
 from setuptools import setup, find_namespace_packages
 
-if sys.version_info < (3, 7):
-    print('Error: Soda SQL requires at least Python 3.7')
-    print('Error: Please upgrade your Python version to 3.7 or later')
-    sys.exit(1)
-
 package_name = "soda-sql-core"
 # Managed by tbump - don't change manually
 # And we can't have nice semver (<major>.<minor>.<patch>-<pre-release>-<build>)
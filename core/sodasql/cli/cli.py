@@ -21,6 +21,7 @@ import yaml
 from sodasql.__version__ import SODA_SQL_VERSION
 from sodasql.cli.indenting_yaml_dumper import IndentingDumper
 from sodasql.common.logging_helper import LoggingHelper
+from sodasql.common.yaml_helper import SAFE_LOADER
 from sodasql.dataset_analyzer import DatasetAnalyzer
 from sodasql.scan.file_system import FileSystemSingleton
 from sodasql.scan.metric import Metric
@@ -114,7 +115,7 @@ def create(warehouse_type: str,
         env_vars_file_exists = file_system.file_exists(env_vars_file)
         if env_vars_file_exists:
             env_vars_yml_str = file_system.file_read_as_str(env_vars_file)
-            existing_env_vars_yml_dict = yaml.load(env_vars_yml_str, Loader=yaml.SafeLoader)
+            existing_env_vars_yml_dict = yaml.load(env_vars_yml_str, Loader=SAFE_LOADER)
             if isinstance(existing_env_vars_yml_dict, dict) and warehouse in existing_env_vars_yml_dict:
                 logging.info(f"Warehouse section {warehouse} already exists in {env_vars_file}.  Skipping...")
                 warehouse_env_vars_dict = None
@@ -224,78 +225,82 @@ def analyze(warehouse_file: str, include: str, exclude: str):
 
         first_table_scan_yml_file = None
 
-        dialect = warehouse.dialect
-        tables_metadata_query = dialect.sql_tables_metadata_query()
-        rows = warehouse.sql_fetchall(tables_metadata_query)
+        table_names = warehouse.get_table_names()
 
         table_include_regex = create_table_filter_regex(include)
         table_exclude_regex = create_table_filter_regex(exclude)
 
-        for row in rows:
-            table_name = row[0]
-
+        analyzed_table_names = []
+        for table_name in table_names:
             if (matches_table_include(table_name, table_include_regex)
                     and matches_table_exclude(table_name, table_exclude_regex)):
-                dataset_analyzer = DatasetAnalyzer()
-                dataset_analyze_results = dataset_analyzer.analyze(warehouse, table_name)
-
-                table_scan_yaml_file = file_system.join(table_dir, f'{fileify(table_name)}.yml')
-
-                if not first_table_scan_yml_file:
-                    first_table_scan_yml_file = table_scan_yaml_file
-
-                if file_system.file_exists(table_scan_yaml_file):
-                    logging.info(f"Scan file {table_scan_yaml_file} already exists")
-                else:
-                    logging.info(f"Creating {table_scan_yaml_file} ...")
-                    from sodasql.scan.scan_yml_parser import (KEY_METRICS,
-                                                              KEY_TABLE_NAME,
-                                                              KEY_TESTS,
-                                                              KEY_COLUMNS,
-                                                              COLUMN_KEY_VALID_FORMAT,
-                                                              COLUMN_KEY_TESTS)
-                    scan_yaml_dict = {
-                        KEY_TABLE_NAME: table_name,
-                        KEY_METRICS:
-                            [Metric.ROW_COUNT] +
-                            Metric.METRIC_GROUPS[Metric.METRIC_GROUP_MISSING] +
-                            Metric.METRIC_GROUPS[Metric.METRIC_GROUP_VALIDITY] +
-                            Metric.METRIC_GROUPS[Metric.METRIC_GROUP_LENGTH] +
-                            Metric.METRIC_GROUPS[Metric.METRIC_GROUP_STATISTICS],
-                        KEY_TESTS: [
-                            'row_count > 0'
-                        ]
-                    }
-
-                    columns = {}
-                    for column_analysis_result in dataset_analyze_results:
-                        if column_analysis_result.validity_format:
-                            column_yml = {
-                                COLUMN_KEY_VALID_FORMAT: column_analysis_result.validity_format
-                            }
-                            values_count = column_analysis_result.values_count
-                            valid_count = column_analysis_result.valid_count
-                            if valid_count > (values_count * .8):
-                                valid_percentage = valid_count * 100 / values_count
-                                invalid_threshold = (100 - valid_percentage) * 1.1
-                                invalid_threshold_rounded = ceil(invalid_threshold)
-                                invalid_comparator = '==' if invalid_threshold_rounded == 0 else '<='
-                                column_yml[COLUMN_KEY_TESTS] = [
-                                    f'invalid_percentage {invalid_comparator} {str(invalid_threshold_rounded)}'
-                                ]
-                                columns[column_analysis_result.column_name] = column_yml
-
-                    if columns:
-                        scan_yaml_dict[KEY_COLUMNS] = columns
-
-                    scan_yml_str = yaml.dump(scan_yaml_dict,
-                                             sort_keys=False,
-                                             Dumper=IndentingDumper,
-                                             default_flow_style=False)
-                    file_system.file_write_from_str(table_scan_yaml_file, scan_yml_str)
+                analyzed_table_names.append(table_name)
             else:
                 logging.info(f"Skipping table {table_name}")
 
+        # One query for the columns of the analyzed tables instead of one per table
+        if len(analyzed_table_names) > 1:
+            warehouse.prefetch_columns_metadata(analyzed_table_names)
+
+        for table_name in analyzed_table_names:
+            dataset_analyzer = DatasetAnalyzer()
+            dataset_analyze_results = dataset_analyzer.analyze(warehouse, table_name)
+
+            table_scan_yaml_file = file_system.join(table_dir, f'{fileify(table_name)}.yml')
+
+            if not first_table_scan_yml_file:
+                first_table_scan_yml_file = table_scan_yaml_file
+
+            if file_system.file_exists(table_scan_yaml_file):
+                logging.info(f"Scan file {table_scan_yaml_file} already exists")
+            else:
+                logging.info(f"Creating {table_scan_yaml_file} ...")
+                from sodasql.scan.scan_yml_parser import (KEY_METRICS,
+                                                          KEY_TABLE_NAME,
+                                                          KEY_TESTS,
+                                                          KEY_COLUMNS,
+                                                          COLUMN_KEY_VALID_FORMAT,
+                                                          COLUMN_KEY_TESTS)
+                scan_yaml_dict = {
+                    KEY_TABLE_NAME: table_name,
+                    KEY_METRICS:
+                        [Metric.ROW_COUNT] +
+                        Metric.METRIC_GROUPS[Metric.METRIC_GROUP_MISSING] +
+                        Metric.METRIC_GROUPS[Metric.METRIC_GROUP_VALIDITY] +
+                        Metric.METRIC_GROUPS[Metric.METRIC_GROUP_LENGTH] +
+                        Metric.METRIC_GROUPS[Metric.METRIC_GROUP_STATISTICS],
+                    KEY_TESTS: [
+                        'row_count > 0'
+                    ]
+                }
+
+                columns = {}
+                for column_analysis_result in dataset_analyze_results:
+                    if column_analysis_result.validity_format:
+                        column_yml = {
+                            COLUMN_KEY_VALID_FORMAT: column_analysis_result.validity_format
+                        }
+                        values_count = column_analysis_result.values_count
+                        valid_count = column_analysis_result.valid_count
+                        if valid_count > (values_count * .8):
+                            valid_percentage = valid_count * 100 / values_count
+                            invalid_threshold = (100 - valid_percentage) * 1.1
+                            invalid_threshold_rounded = ceil(invalid_threshold)
+                            invalid_comparator = '==' if invalid_threshold_rounded == 0 else '<='
+                            column_yml[COLUMN_KEY_TESTS] = [
+                                f'invalid_percentage {invalid_comparator} {str(invalid_threshold_rounded)}'
+                            ]
+                            columns[column_analysis_result.column_name] = column_yml
+
+                if columns:
+                    scan_yaml_dict[KEY_COLUMNS] = columns
+
+                scan_yml_str = yaml.dump(scan_yaml_dict,
+                                         sort_keys=False,
+                                         Dumper=IndentingDumper,
+                                         default_flow_style=False)
+                file_system.file_write_from_str(table_scan_yaml_file, scan_yml_str)
+
         logging.info(
             f"Next run 'soda scan {warehouse_file} {first_table_scan_yml_file}' to calculate measurements and run tests")
 
@@ -304,11 +309,8 @@ def analyze(warehouse_file: str, include: str, exclude: str):
         sys.exit(1)
 
     finally:
-        if warehouse and warehouse.connection:
-            try:
-                warehouse.connection.close()
-            except Exception as e:
-                logging.debug(f'Closing connection failed: {str(e)}')
+        if warehouse:
+            warehouse.close()
 
 
 @main.command()
@@ -2,12 +2,16 @@ import logging
 
 import yaml
 
+# The libyaml based loader is a lot faster than the pure Python one,
+# but it's only available when PyYAML was built with libyaml
+SAFE_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
 
 class YamlHelper:
 
     @staticmethod
     def parse_yaml(yaml_str: str, description: str = None):
         try:
-            return yaml.load(yaml_str, Loader=yaml.SafeLoader)
+            return yaml.load(yaml_str, Loader=SAFE_LOADER)
         except Exception as e:
             logging.error(f'Parsing YAML failed: {str(e)}: ({description if description else yaml_str})xWW4')
@@ -40,10 +40,12 @@ class DatasetAnalyzer:
 
         analyze_results: List[ColumnAnalysisResult] = []
 
-        sql = dialect.sql_columns_metadata_query(table_name)
-        column_tuple_list = dialect.sql_columns_metadata(table_name)
-        column_tuples = warehouse.sql_fetchall(sql) if len(
-            column_tuple_list) == 0 else column_tuple_list
+        column_tuples = warehouse.get_prefetched_columns_metadata(table_name)
+        if column_tuples is None:
+            sql = dialect.sql_columns_metadata_query(table_name)
+            column_tuple_list = dialect.sql_columns_metadata(table_name)
+            column_tuples = warehouse.sql_fetchall(sql) if len(
+                column_tuple_list) == 0 else column_tuple_list
         for column_tuple in column_tuples:
             column_name = column_tuple[0]
             source_type = column_tuple[1]
@@ -55,7 +57,7 @@ class DatasetAnalyzer:
             qualified_column_name = dialect.qualify_column_name(column_name)
             select_with_limit_query = dialect.sql_select_with_limit(qualified_table_name, 1000)
 
-            if dialect.is_text(source_type):
+            if dialect.is_text(source_type.upper()):
                 column_analysis_result.is_text = True
 
                 validity_format_count_fields = []
@@ -11,12 +11,13 @@
 import re
 from datetime import date
 from numbers import Number
-from typing import List
+from typing import Callable, List, Optional
 import importlib
 import logging
 
 from sodasql.exceptions.exceptions import WarehouseConnectionError, WarehouseAuthenticationError
 from sodasql.scan.column_metadata import ColumnMetadata
+from sodasql.scan.db import sql_fetchall, sql_fetchone
 from sodasql.scan.parser import Parser
 from sodasql.__version__ import SODA_SQL_VERSION
 
@@ -108,12 +109,61 @@ class Dialect:
     def create_connection(self):
         raise RuntimeError('TODO override and implement this abstract method')
 
+    def close_connection(self, connection):
+        # Dialects that reuse connections across scans can override this to keep the connection open
+        connection.close()
+
+    def sql_fetchall_multi(self, connection, sqls: List[str]) -> List[List[tuple]]:
+        """
+        Returns the rows of each of the given queries in the same order.
+        Dialects that support multi statement requests can override this to submit all queries at once.
+        """
+        return [sql_fetchall(connection, sql) for sql in sqls]
+
+    def sql_fetchone_async(self, connection, sql: str) -> Callable[[], tuple]:
+        """
+        Submits the query and returns a function that waits for the query to finish and returns the tuple
+        obtained by cursor.fetchone(). Dialects that support asynchronous queries can override this so that
+        multiple queries run in parallel on the warehouse. By default the query is executed right away.
+        """
+        row_tuple = sql_fetchone(connection, sql)
+        return lambda: row_tuple
+
     def sql_columns_metadata_query(self, table_name: str) -> str:
         raise RuntimeError('TODO override and implement this abstract method')
 
+    def sql_all_columns_metadata_query(self, table_names: Optional[List[str]] = None) -> Optional[str]:
+        """
+        Optional query to fetch the column metadata of all tables, or only of the given table names, at once.
+        The query must return tuples of (table_name, column_name, data_type, is_nullable) ordered by table
+        and column position.  Returns None if the dialect doesn't support this.
+        """
+        return None
+
+    def connection_key(self) -> Optional[tuple]:
+        """
+        Optional identity of the database and schema that the connections of this dialect query,
+        dialects of the same type with the same connection key see the same metadata.
+        Returns None if the dialect doesn't support this.
+        """
+        return None
+
+    @staticmethod
+    def sql_table_names_condition(table_names: Optional[List[str]]) -> str:
+        """
+        Returns the condition that restricts an information_schema query to the given table names, case
+        insensitive, or an empty string if no table names are given
+        """
+        if not table_names:
+            return ''
+        quoted_table_names = ', '.join("'" + table_name.lower().replace("'", "''") + "'"
+                                       for table_name in table_names)
+        return f" \n  AND lower(table_name) IN ({quoted_table_names})"
+
     def sql_tables_metadata_query(self, limit: str = 10, filter: str = None):
         raise RuntimeError('TODO override and implement this abstract method')
 
+    # The is_text, is_number and is_time methods expect the upper case column type
     def is_text(self, column_type: str):
         raise RuntimeError('TODO override this method')
 
@@ -201,9 +251,10 @@ class Dialect:
         return f'SELECT * FROM {table_name} LIMIT {count}'
 
     def sql_expr_list(self, column: ColumnMetadata, values: List[str]) -> str:
-        if self.is_text(column.type):
+        column_type = column.type.upper()
+        if self.is_text(column_type):
             sql_values = [self.literal_string(value) for value in values]
-        elif self.is_number(column.type):
+        elif self.is_number(column_type):
             sql_values = [self.literal_number(value) for value in values]
         else:
             raise RuntimeError(
@@ -11,6 +11,7 @@
 import logging
 import os
 from pathlib import Path
+from typing import Optional
 
 
 class FileSystem:
@@ -61,6 +62,13 @@ class FileSystem:
         except Exception as e:
             logging.debug(f"Couldn't read {str(path)}: {str(e)}")
 
+    def file_modification_time(self, path: str) -> Optional[float]:
+        expanded_path = os.path.expanduser(path)
+        try:
+            return os.path.getmtime(expanded_path)
+        except OSError:
+            return None
+
     def file_write_from_str(self, path: str, file_content_str):
         expanded_path = os.path.expanduser(path)
         path_path: Path = Path(expanded_path)
@@ -40,7 +40,7 @@ class Metric:
     VALUES_PERCENTAGE = 'values_percentage'
     VARIANCE = 'variance'
 
-    METRIC_TYPES = [
+    METRIC_TYPES = frozenset([
         ROW_COUNT,
         SCHEMA,
 
@@ -69,7 +69,7 @@ class Metric:
         VALUES_COUNT,
         VALUES_PERCENTAGE,
         VARIANCE,
-    ]
+    ])
 
     METRIC_GROUP_ALL = 'all'
     METRIC_GROUP_DUPLICATES = 'duplicates'
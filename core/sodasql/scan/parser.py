@@ -13,10 +13,12 @@ import logging
 import os
 import traceback
 from collections import deque
+from contextlib import contextmanager
 from dataclasses import dataclass
-from typing import Deque, List, Optional
+from typing import Collection, Deque, List, Optional
 
 import yaml
+from sodasql.common.yaml_helper import SAFE_LOADER
 from sodasql.scan.test import Test
 
 ERROR = 'error'
@@ -55,6 +57,8 @@ class ParseContext:
 
 class Parser:
 
+    __slots__ = ('description', 'contexts', 'logs')
+
     def __init__(self, description: str):
         self.description: str = description
         self.contexts: Deque[ParseContext] = deque()
@@ -72,7 +76,7 @@ class Parser:
 
     def _parse_yaml_str(self, yaml_str):
         try:
-            return yaml.load(yaml_str, Loader=yaml.SafeLoader)
+            return yaml.load(yaml_str, Loader=SAFE_LOADER)
         except Exception as e:
             self.error(f"Couldn't parse yaml in {self.description}: {str(e)}")
 
@@ -83,6 +87,17 @@ class Parser:
     def _pop_context(self):
         return self.contexts.pop()
 
+    @contextmanager
+    def _context(self, object=None, name: Optional[object] = None):
+        """
+        Pushes the context for the duration of the with block and pops it, also when an exception is raised
+        """
+        self._push_context(object, name)
+        try:
+            yield
+        finally:
+            self._pop_context()
+
     def _get_context_description(self):
         return '.'.join([context.name for context in self.contexts if context.name])
 
@@ -99,13 +114,16 @@ class Parser:
         for log in self.logs:
             log.log()
 
-    def check_invalid_keys(self, valid_keys: List[str]):
+    def check_invalid_keys(self, valid_keys: Collection[str]):
         """
         Adds a warning for all invalid configured property names
         """
         context_iterable = self._get_current_context_object()
-        for invalid_key in [configured_key for configured_key in context_iterable if configured_key not in valid_keys]:
-            self.warning(f'Invalid key in {self._get_context_description()} : {invalid_key}', invalid_key)
+        invalid_keys = [configured_key for configured_key in context_iterable if configured_key not in valid_keys]
+        if invalid_keys:
+            context_description = self._get_context_description()
+            for invalid_key in invalid_keys:
+                self.warning(f'Invalid key in {context_description} : {invalid_key}', invalid_key)
 
     def has_warnings_or_errors(self):
         for log in self.logs:
@@ -239,13 +257,10 @@ class Parser:
                 })
             test_ymls = test_ymls_list
 
-        self._push_context(None, tests_key)
-        try:
+        with self._context(None, tests_key):
             if isinstance(test_ymls, list):
-                for test_index in range(len(test_ymls)):
-                    test_yml = test_ymls[test_index]
-                    self._push_context(test_yml, str(test_index))
-                    try:
+                for test_index, test_yml in enumerate(test_ymls):
+                    with self._context(test_yml, test_index):
                         test_name = None
                         test_title = None
                         test_expression = None
@@ -269,14 +284,10 @@ class Parser:
                                                context_sql_metric_index=context_sql_metric_index)
                         if test:
                             tests.append(test)
-                    finally:
-                        self._pop_context()
 
             elif test_ymls is not None:
                 self.error(
                     f'Tests should be either a list of test expressions or an object of named test expressions: {test_ymls} ({str(type(test_ymls))})')
-        finally:
-            self._pop_context()
 
         return tests
 
@@ -330,7 +341,8 @@ class Parser:
                         title=test_title,
                         expression=test_expression,
                         metrics=metrics,
-                        column=context_column_name)
+                        column=context_column_name,
+                        code=compiled_code)
 
         except SyntaxError:
             stacktrace_lines = traceback.format_exc().splitlines()
@@ -18,7 +18,7 @@ class Sampler:
     def __init__(self, scan: Scan):
         self.scan = scan
         self.scan_reference = self.scan.scan_reference
-        self.scan_folder_name = (f'{self._fileify(self.scan.warehouse.name)}' +
+        self.scan_folder_name = (self._fileify(self.scan.warehouse.name) +
                                  f'-{self._fileify(self.scan.scan_yml.table_name)}' +
                                  (f'-{self._fileify(self.scan.time)}' if isinstance(self.scan.time, str) else '') +
                                  (f'-{self.scan.time.strftime("%Y%m%d%H%M%S")}' if isinstance(self.scan.time, datetime) else '') +
@@ -125,7 +125,7 @@ class Sampler:
         return (f'{self.scan_folder_name}/' +
                 (f'{self._fileify(column_name)}_' if column_name else '') +
                 'failed_rows_' +
-                f'{self._fileify(failed_rows_sql_metric_yml.name)}' +
+                self._fileify(failed_rows_sql_metric_yml.name) +
                 '.jsonl')
 
     def __serialize_file_upload_value(self, value):
@@ -11,9 +11,11 @@
 
 import logging
 import tempfile
+from dataclasses import dataclass
 from datetime import datetime
 from math import floor, ceil
-from typing import List, Optional
+from typing import Callable, Dict, List, Optional, Tuple
+from weakref import WeakKeyDictionary
 
 from jinja2 import Template
 
@@ -30,6 +32,37 @@ from sodasql.scan.test_result import TestResult
 from sodasql.scan.warehouse import Warehouse
 from sodasql.soda_server_client.soda_server_client import SodaServerClient
 
+LENGTH_METRICS = frozenset([Metric.AVG_LENGTH, Metric.MIN_LENGTH, Metric.MAX_LENGTH])
+NUMERIC_AGGREGATION_METRICS = frozenset([Metric.MIN, Metric.MAX, Metric.AVG, Metric.SUM, Metric.VARIANCE, Metric.STDDEV])
+# Maximum number of cached aggregation queries per scan yml, eg for scans with different filter variables
+AGGREGATION_QUERY_CACHE_SIZE = 8
+
+
+@dataclass
+class AggregationQuery:
+    # None if no aggregation metrics are enabled
+    sql: Optional[str]
+    # The measurements in the order of the query fields, the values are set from the query result
+    measurements: List[Measurement]
+    # maps db column names (lower) to missing and invalid metric indices in the measurements
+    # eg { 'colname': {'missing': 2, 'invalid': 3}, ...}
+    column_metric_indices: Dict[str, dict]
+    row_count_index: Optional[int]
+
+    def copy(self):
+        """
+        Returns a copy with new measurements without values
+        """
+        return AggregationQuery(sql=self.sql,
+                                measurements=[Measurement(measurement.metric, measurement.column_name)
+                                              for measurement in self.measurements],
+                                column_metric_indices=self.column_metric_indices,
+                                row_count_index=self.row_count_index)
+
+
+# maps scan ymls to their aggregation queries by aggregation query cache key, see Scan._get_aggregation_query
+_AGGREGATION_QUERY_CACHE: WeakKeyDictionary = WeakKeyDictionary()
+
 
 class Scan:
 
@@ -53,11 +86,17 @@ class Scan:
         self.column_names: List[str] = []
         # maps column names (lower case) to ScanColumn's
         self.scan_columns: dict = {}
+        # maps column names (lower case) to the metric values of the measurements flushed so far
+        # table measurement values are stored under key None
+        self.measurement_values_by_column: Dict[Optional[str], dict] = {}
         self.close_warehouse = True
         self.send_scan_end = True
         self.start_time = None
         self.queries_executed = 0
         self.sampler = None
+        self.execution_failed = False
+        # The submitted aggregation query and the function to fetch its result, see _submit_aggregations
+        self.pending_aggregation: Optional[Tuple[AggregationQuery, Callable[[], tuple]]] = None
 
         self.table_sample_clause = \
             f'\nTABLESAMPLE {scan_yml.sample_method}({scan_yml.sample_percentage})' \
@@ -71,6 +110,14 @@ class Scan:
             self.filter_sql = scan_yml.filter_template.render(variables)
 
     def execute(self) -> ScanResult:
+        self._start_execution()
+        return self._complete_execution()
+
+    def _start_execution(self, async_aggregations: bool = False):
+        """
+        Executes the scan up to the submission of the aggregation query, see _complete_execution.
+        With async_aggregations, the aggregation query is submitted without waiting for its result.
+        """
         self.start_time = datetime.now()
         if self.soda_server_client:
             logging.debug(f'Soda cloud: {self.soda_server_client.host}')
@@ -83,20 +130,27 @@ class Scan:
             if self.scan_yml:
                 # Soda Server and the code below require that the schema measurements is the first measurement
                 self._query_columns_metadata()
-                self._query_aggregations()
-                self._query_group_by_value()
-                self._query_histograms()
+                self._submit_aggregations(async_aggregations)
+        except Exception as e:
+            self._handle_execution_exception(e)
 
-            self._query_sql_metrics_and_run_tests()
-            self._run_table_tests()
-            self._run_column_tests()
-            self._take_samples()
+    def _complete_execution(self) -> ScanResult:
+        try:
+            if not self.execution_failed:
+                if self.scan_yml:
+                    self._fetch_aggregations()
+                    self._query_group_by_value()
+                    self._query_histograms()
+
+                self._query_sql_metrics_and_run_tests()
+                self._run_table_tests()
+                self._run_column_tests()
+                self._take_samples()
 
-            logging.debug(f'Executed {self.queries_executed} queries in {(datetime.now() - self.start_time)}')
+                logging.debug(f'Executed {self.queries_executed} queries in {(datetime.now() - self.start_time)}')
 
         except Exception as e:
-            logging.exception('Exception during scan')
-            self.scan_result.add_error(ScanError('Exception during scan', e))
+            self._handle_execution_exception(e)
 
         finally:
             if self.soda_server_client and self.send_scan_end:
@@ -111,11 +165,18 @@ class Scan:
 
         return self.scan_result
 
+    def _handle_execution_exception(self, e: Exception):
+        logging.exception('Exception during scan')
+        self.scan_result.add_error(ScanError('Exception during scan', e))
+        self.execution_failed = True
+
     def _query_columns_metadata(self):
-        sql = self.warehouse.dialect.sql_columns_metadata_query(self.scan_yml.table_name)
-        column_tuples = self.warehouse.sql_fetchall(sql) if sql != '' else self.warehouse.dialect.sql_columns_metadata(
-            self.scan_yml.table_name)
-        self.queries_executed += 1
+        column_tuples = self.warehouse.get_prefetched_columns_metadata(self.scan_yml.table_name)
+        if column_tuples is None:
+            sql = self.warehouse.dialect.sql_columns_metadata_query(self.scan_yml.table_name)
+            column_tuples = self.warehouse.sql_fetchall(sql) if sql != '' else \
+                self.warehouse.dialect.sql_columns_metadata(self.scan_yml.table_name)
+            self.queries_executed += 1
         self.column_metadatas = []
         for column_tuple in column_tuples:
             name = column_tuple[0]
@@ -140,7 +201,7 @@ class Scan:
         self._log_measurement(schema_measurement)
         self._flush_measurements([schema_measurement])
 
-    def _query_aggregations(self):
+    def _build_aggregation_query(self) -> AggregationQuery:
         # This measurements list is used to match measurements with the query field order.
         # After query execution, the value of the measurements will be extracted from the query result and
         # the measurements will be added with self.add_query(measurement)
@@ -150,133 +211,207 @@ class Scan:
 
         dialect = self.warehouse.dialect
 
+        row_count_index = None
         if self.scan_yml.is_metric_enabled(Metric.ROW_COUNT):
+            row_count_index = len(measurements)
             fields.append(dialect.sql_expr_count_all())
             measurements.append(Measurement(Metric.ROW_COUNT))
 
-        # maps db column names (lower) to missing and invalid metric indices in the measurements
-        # eg { 'colname': {'missing': 2, 'invalid': 3}, ...}
         column_metric_indices = {}
 
-        try:
-            for column_name_lower, scan_column in self.scan_columns.items():
-                metric_indices = {}
-                column_metric_indices[column_name_lower] = metric_indices
-                column_name = scan_column.column_name
+        for column_name_lower, scan_column in self.scan_columns.items():
+            enabled_metrics = scan_column.enabled_metrics
+            if not (scan_column.is_missing_enabled
+                    or scan_column.is_valid_enabled
+                    or (scan_column.is_text and not enabled_metrics.isdisjoint(LENGTH_METRICS))
+                    or (scan_column.is_numeric and not enabled_metrics.isdisjoint(NUMERIC_AGGREGATION_METRICS))):
+                continue
+
+            metric_indices = {}
+            column_metric_indices[column_name_lower] = metric_indices
+            column_name = scan_column.column_name
 
-                if scan_column.is_missing_enabled:
-                    metric_indices['non_missing'] = len(measurements)
-                    if scan_column.non_missing_condition:
-                        fields.append(dialect.sql_expr_count_conditional(scan_column.non_missing_condition))
-                    else:
-                        fields.append(dialect.sql_expr_count(scan_column.qualified_column_name))
-                    measurements.append(Measurement(Metric.VALUES_COUNT, column_name))
+            if scan_column.is_missing_enabled:
+                metric_indices['non_missing'] = len(measurements)
+                if scan_column.non_missing_condition:
+                    fields.append(dialect.sql_expr_count_conditional(scan_column.non_missing_condition))
+                else:
+                    fields.append(dialect.sql_expr_count(scan_column.qualified_column_name))
+                measurements.append(Measurement(Metric.VALUES_COUNT, column_name))
 
-                if scan_column.is_valid_enabled:
-                    metric_indices['valid'] = len(measurements)
-                    if scan_column.non_missing_and_valid_condition:
-                        fields.append(dialect.sql_expr_count_conditional(scan_column.non_missing_and_valid_condition))
-                    else:
-                        fields.append(dialect.sql_expr_count(scan_column.qualified_column_name))
-                    measurements.append(Measurement(Metric.VALID_COUNT, column_name))
-
-                if scan_column.is_text:
-                    length_expr = dialect.sql_expr_conditional(
-                        scan_column.non_missing_and_valid_condition,
-                        dialect.sql_expr_length(scan_column.qualified_column_name)) \
-                        if scan_column.non_missing_and_valid_condition \
-                        else dialect.sql_expr_length(scan_column.qualified_column_name)
-
-                    if self.scan_yml.is_metric_enabled(Metric.AVG_LENGTH, column_name):
-                        fields.append(dialect.sql_expr_avg(length_expr))
-                        measurements.append(Measurement(Metric.AVG_LENGTH, column_name))
-
-                    if self.scan_yml.is_metric_enabled(Metric.MIN_LENGTH, column_name):
-                        fields.append(dialect.sql_expr_min(length_expr))
-                        measurements.append(Measurement(Metric.MIN_LENGTH, column_name))
-
-                    if self.scan_yml.is_metric_enabled(Metric.MAX_LENGTH, column_name):
-                        fields.append(dialect.sql_expr_max(length_expr))
-                        measurements.append(Measurement(Metric.MAX_LENGTH, column_name))
-
-                if scan_column.is_numeric:
-                    if scan_column.is_metric_enabled(Metric.MIN):
-                        fields.append(dialect.sql_expr_min(scan_column.numeric_expr))
-                        measurements.append(Measurement(Metric.MIN, column_name))
-
-                    if scan_column.is_metric_enabled(Metric.MAX):
-                        fields.append(dialect.sql_expr_max(scan_column.numeric_expr))
-                        measurements.append(Measurement(Metric.MAX, column_name))
-
-                    if scan_column.is_metric_enabled(Metric.AVG):
-                        fields.append(dialect.sql_expr_avg(scan_column.numeric_expr))
-                        measurements.append(Measurement(Metric.AVG, column_name))
-
-                    if scan_column.is_metric_enabled(Metric.SUM):
-                        fields.append(dialect.sql_expr_sum(scan_column.numeric_expr))
-                        measurements.append(Measurement(Metric.SUM, column_name))
-
-                    if scan_column.is_metric_enabled(Metric.VARIANCE):
-                        fields.append(dialect.sql_expr_variance(scan_column.numeric_expr))
-                        measurements.append(Measurement(Metric.VARIANCE, column_name))
-
-                    if scan_column.is_metric_enabled(Metric.STDDEV):
-                        fields.append(dialect.sql_expr_stddev(scan_column.numeric_expr))
-                        measurements.append(Measurement(Metric.STDDEV, column_name))
-
-            if len(fields) > 0:
-                sql = 'SELECT \n  ' + ',\n  '.join(fields) + ' \n' \
-                                                             'FROM ' + self.qualified_table_name
-                if self.table_sample_clause:
-                    sql += f'\n{self.table_sample_clause}'
-                if self.filter_sql:
-                    sql += f'\nWHERE {self.filter_sql}'
-
-                query_result_tuple = self.warehouse.sql_fetchone(sql)
+            if scan_column.is_valid_enabled:
+                metric_indices['valid'] = len(measurements)
+                if scan_column.non_missing_and_valid_condition:
+                    fields.append(dialect.sql_expr_count_conditional(scan_column.non_missing_and_valid_condition))
+                else:
+                    fields.append(dialect.sql_expr_count(scan_column.qualified_column_name))
+                measurements.append(Measurement(Metric.VALID_COUNT, column_name))
+
+            if scan_column.is_text and not enabled_metrics.isdisjoint(LENGTH_METRICS):
+                length_expr = dialect.sql_expr_length(scan_column.qualified_column_name)
+                if scan_column.non_missing_and_valid_condition:
+                    length_expr = dialect.sql_expr_conditional(scan_column.non_missing_and_valid_condition,
+                                                               length_expr)
+
+                if Metric.AVG_LENGTH in enabled_metrics:
+                    fields.append(dialect.sql_expr_avg(length_expr))
+                    measurements.append(Measurement(Metric.AVG_LENGTH, column_name))
+
+                if Metric.MIN_LENGTH in enabled_metrics:
+                    fields.append(dialect.sql_expr_min(length_expr))
+                    measurements.append(Measurement(Metric.MIN_LENGTH, column_name))
+
+                if Metric.MAX_LENGTH in enabled_metrics:
+                    fields.append(dialect.sql_expr_max(length_expr))
+                    measurements.append(Measurement(Metric.MAX_LENGTH, column_name))
+
+            if scan_column.is_numeric:
+                numeric_expr = scan_column.numeric_expr
+                if Metric.MIN in enabled_metrics:
+                    fields.append(dialect.sql_expr_min(numeric_expr))
+                    measurements.append(Measurement(Metric.MIN, column_name))
+
+                if Metric.MAX in enabled_metrics:
+                    fields.append(dialect.sql_expr_max(numeric_expr))
+                    measurements.append(Measurement(Metric.MAX, column_name))
+
+                if Metric.AVG in enabled_metrics:
+                    fields.append(dialect.sql_expr_avg(numeric_expr))
+                    measurements.append(Measurement(Metric.AVG, column_name))
+
+                if Metric.SUM in enabled_metrics:
+                    fields.append(dialect.sql_expr_sum(numeric_expr))
+                    measurements.append(Measurement(Metric.SUM, column_name))
+
+                if Metric.VARIANCE in enabled_metrics:
+                    fields.append(dialect.sql_expr_variance(numeric_expr))
+                    measurements.append(Measurement(Metric.VARIANCE, column_name))
+
+                if Metric.STDDEV in enabled_metrics:
+                    fields.append(dialect.sql_expr_stddev(numeric_expr))
+                    measurements.append(Measurement(Metric.STDDEV, column_name))
+
+        sql = None
+        if len(fields) > 0:
+            sql = 'SELECT \n  ' + ',\n  '.join(fields) + ' \n' \
+                                                         'FROM ' + self.qualified_table_name
+            if self.table_sample_clause:
+                sql += f'\n{self.table_sample_clause}'
+            if self.filter_sql:
+                sql += f'\nWHERE {self.filter_sql}'
+
+        return AggregationQuery(sql=sql,
+                                measurements=measurements,
+                                column_metric_indices=column_metric_indices,
+                                row_count_index=row_count_index)
+
+    def _get_aggregation_query(self) -> AggregationQuery:
+        """
+        Repeated scans with the same scan yml on a table with the same columns build the same aggregation
+        query, so the aggregation queries are cached per scan yml and reused with new measurements.
+        The scan yml can be changed in between scans, so the key also contains the scan configuration
+        that the aggregation query is built from.
+        """
+        scan_configuration = (self.scan_yml.is_metric_enabled(Metric.ROW_COUNT),
+                              tuple((column_name_lower,
+                                     scan_column.enabled_metrics,
+                                     scan_column.is_missing_enabled,
+                                     scan_column.is_valid_enabled,
+                                     scan_column.non_missing_condition,
+                                     scan_column.non_missing_and_valid_condition,
+                                     scan_column.numeric_expr)
+                                    for column_name_lower, scan_column in self.scan_columns.items()))
+        cache_key = (type(self.dialect),
+                     self.qualified_table_name,
+                     self.table_sample_clause,
+                     self.filter_sql,
+                     tuple((column_metadata.name, column_metadata.type, column_metadata.nullable)
+                           for column_metadata in self.column_metadatas),
+                     scan_configuration)
+        aggregation_queries = _AGGREGATION_QUERY_CACHE.setdefault(self.scan_yml, {})
+        aggregation_query = aggregation_queries.get(cache_key)
+        if aggregation_query is None:
+            aggregation_query = self._build_aggregation_query()
+            if len(aggregation_queries) >= AGGREGATION_QUERY_CACHE_SIZE:
+                del aggregation_queries[next(iter(aggregation_queries))]
+            aggregation_queries[cache_key] = aggregation_query
+        return aggregation_query.copy()
+
+    def _submit_aggregations(self, async_aggregations: bool = False):
+        self.pending_aggregation = None
+        try:
+            aggregation_query = self._get_aggregation_query()
+            if aggregation_query.sql:
+                if async_aggregations:
+                    fetch = self.warehouse.sql_fetchone_async(aggregation_query.sql)
+                else:
+                    query_result_tuple = self.warehouse.sql_fetchone(aggregation_query.sql)
+                    fetch = lambda: query_result_tuple
                 self.queries_executed += 1
+                self.pending_aggregation = (aggregation_query, fetch)
+        except Exception as e:
+            self.scan_result.add_error(ScanError(f'Exception during aggregation query', e))
 
-                for i in range(0, len(measurements)):
-                    measurement = measurements[i]
-                    measurement.value = query_result_tuple[i]
-                    self._log_measurement(measurement)
-
-                # Calculating derived measurements
-                row_count_measurement = next((m for m in measurements if m.metric == Metric.ROW_COUNT), None)
-                if row_count_measurement:
-                    row_count = row_count_measurement.value
-                    for column_name_lower, scan_column in self.scan_columns.items():
-                        column_name = scan_column.column_name
-                        metric_indices = column_metric_indices[column_name_lower]
-                        non_missing_index = metric_indices.get('non_missing')
-                        if non_missing_index is not None:
-                            values_count = measurements[non_missing_index].value
-                            missing_count = row_count - values_count
-                            missing_percentage = missing_count * 100 / row_count if row_count > 0 else None
-                            values_percentage = values_count * 100 / row_count if row_count > 0 else None
-
-                            self._log_and_append_derived_measurements(measurements, [
-                                Measurement(Metric.MISSING_PERCENTAGE, column_name, missing_percentage),
-                                Measurement(Metric.MISSING_COUNT, column_name, missing_count),
-                                Measurement(Metric.VALUES_PERCENTAGE, column_name, values_percentage)
-                            ])
-
-                            valid_index = metric_indices.get('valid')
-                            if valid_index is not None:
-                                valid_count = measurements[valid_index].value
-                                invalid_count = row_count - missing_count - valid_count
-                                invalid_percentage = invalid_count * 100 / row_count if row_count > 0 else None
-                                valid_percentage = valid_count * 100 / row_count if row_count > 0 else None
-                                self._log_and_append_derived_measurements(measurements, [
-                                    Measurement(Metric.INVALID_PERCENTAGE, column_name, invalid_percentage),
-                                    Measurement(Metric.INVALID_COUNT, column_name, invalid_count),
-                                    Measurement(Metric.VALID_PERCENTAGE, column_name, valid_percentage)
-                                ])
-
-            self._flush_measurements(measurements)
+    def _fetch_aggregations(self):
+        if self.pending_aggregation is None:
+            return
+        aggregation_query, fetch = self.pending_aggregation
+        self.pending_aggregation = None
+        try:
+            self._process_aggregation_query_result(aggregation_query, fetch())
         except Exception as e:
             self.scan_result.add_error(ScanError(f'Exception during aggregation query', e))
 
+    def _process_aggregation_query_result(self, aggregation_query: AggregationQuery, query_result_tuple: tuple):
+        measurements = aggregation_query.measurements
+        column_metric_indices = aggregation_query.column_metric_indices
+        row_count_index = aggregation_query.row_count_index
+
+        for measurement, value in zip(measurements, query_result_tuple):
+            measurement.value = value
+            self._log_measurement(measurement)
+
+        # Calculating derived measurements
+        if row_count_index is not None:
+            row_count = measurements[row_count_index].value
+            has_rows = row_count > 0
+            derived_measurements = []
+            for column_name_lower, metric_indices in column_metric_indices.items():
+                non_missing_index = metric_indices.get('non_missing')
+                if non_missing_index is not None:
+                    column_name = measurements[non_missing_index].column_name
+                    values_count = measurements[non_missing_index].value
+                    missing_count = row_count - values_count
+                    missing_percentage = missing_count * 100 / row_count if has_rows else None
+                    values_percentage = values_count * 100 / row_count if has_rows else None
+
+                    derived_measurements.append(
+                        Measurement(Metric.MISSING_PERCENTAGE, column_name, missing_percentage))
+                    derived_measurements.append(Measurement(Metric.MISSING_COUNT, column_name, missing_count))
+                    derived_measurements.append(
+                        Measurement(Metric.VALUES_PERCENTAGE, column_name, values_percentage))
+
+                    valid_index = metric_indices.get('valid')
+                    if valid_index is not None:
+                        valid_count = measurements[valid_index].value
+                        invalid_count = row_count - missing_count - valid_count
+                        invalid_percentage = invalid_count * 100 / row_count if has_rows else None
+                        valid_percentage = valid_count * 100 / row_count if has_rows else None
+
+                        derived_measurements.append(
+                            Measurement(Metric.INVALID_PERCENTAGE, column_name, invalid_percentage))
+                        derived_measurements.append(
+                            Measurement(Metric.INVALID_COUNT, column_name, invalid_count))
+                        derived_measurements.append(
+                            Measurement(Metric.VALID_PERCENTAGE, column_name, valid_percentage))
+
+            self._log_and_append_derived_measurements(measurements, derived_measurements)
+
+        self._flush_measurements(measurements)
+
     def _query_group_by_value(self):
+        # The measurements of all columns are flushed together to send them to Soda Cloud in one request
+        group_by_measurements = []
         for column_name_lower, scan_column in self.scan_columns.items():
             try:
                 measurements = []
@@ -291,81 +426,80 @@ class Scan:
                     numeric_value_expr = scan_column.get_group_by_cte_numeric_value_expression()
                     order_by_value_expr = scan_column.get_order_by_cte_value_expression(numeric_value_expr)
 
-                    if self.scan_yml.is_any_metric_enabled(
-                            [Metric.DISTINCT, Metric.UNIQUENESS, Metric.UNIQUE_COUNT, Metric.DUPLICATE_COUNT],
-                            column_name):
+                    # The queries of a column all select from the same group by cte and are
+                    # submitted together so that dialects can execute them in a single request
+                    sqls = []
+                    query_metrics = []
 
-                        sql = (f'{group_by_cte} \n'
-                               f'SELECT COUNT(*), \n'
-                               f'       COUNT(CASE WHEN frequency = 1 THEN 1 END), \n'
-                               f'       SUM(frequency) \n'
-                               f'FROM group_by_value')
-
-                        query_result_tuple = self.warehouse.sql_fetchone(sql)
-                        self.queries_executed += 1
-
-                        distinct_count = query_result_tuple[0]
-                        unique_count = query_result_tuple[1]
-                        valid_count = query_result_tuple[2] if query_result_tuple[2] else 0
-                        duplicate_count = distinct_count - unique_count
-
-                        self._log_and_append_query_measurement(
-                            measurements, Measurement(Metric.DISTINCT, column_name, distinct_count))
-                        self._log_and_append_query_measurement(
-                            measurements, Measurement(Metric.UNIQUE_COUNT, column_name, unique_count))
-
-                        derived_measurements = [Measurement(Metric.DUPLICATE_COUNT, column_name, duplicate_count)]
-                        if valid_count > 1:
-                            uniqueness = (distinct_count - 1) * 100 / (valid_count - 1)
-                            derived_measurements.append(Measurement(Metric.UNIQUENESS, column_name, uniqueness))
-                        self._log_and_append_derived_measurements(measurements, derived_measurements)
+                    if scan_column.is_any_metric_enabled(
+                            [Metric.DISTINCT, Metric.UNIQUENESS, Metric.UNIQUE_COUNT, Metric.DUPLICATE_COUNT]):
+                        sqls.append(f'{group_by_cte} \n'
+                                    f'SELECT COUNT(*), \n'
+                                    f'       COUNT(CASE WHEN frequency = 1 THEN 1 END), \n'
+                                    f'       SUM(frequency) \n'
+                                    f'FROM group_by_value')
+                        query_metrics.append(Metric.DISTINCT)
 
                     if scan_column.is_metric_enabled(Metric.MINS) and order_by_value_expr:
-                        sql = (f'{group_by_cte} \n'
-                               f'SELECT value \n'
-                               f'FROM group_by_value \n'
-                               f'ORDER BY {order_by_value_expr} ASC \n'
-                               f'{self.dialect.sql_expr_limit(scan_column.mins_maxs_limit)}\n')
-
-                        rows = self.warehouse.sql_fetchall(sql)
-                        self.queries_executed += 1
-
-                        mins = [row[0] for row in rows]
-                        self._log_and_append_query_measurement(measurements,
-                                                               Measurement(Metric.MINS, column_name, mins))
-
-                    if self.scan_yml.is_metric_enabled(Metric.MAXS, column_name) and order_by_value_expr:
-                        sql = (f'{group_by_cte} \n'
-                               f'SELECT value \n'
-                               f'FROM group_by_value \n'
-                               f'ORDER BY {order_by_value_expr} DESC \n'
-                               f'{self.dialect.sql_expr_limit(scan_column.mins_maxs_limit)}\n')
-
-                        rows = self.warehouse.sql_fetchall(sql)
-                        self.queries_executed += 1
-
-                        maxs = [row[0] for row in rows]
-                        self._log_and_append_query_measurement(measurements,
-                                                               Measurement(Metric.MAXS, column_name, maxs))
-
-                    if self.scan_yml.is_metric_enabled(Metric.FREQUENT_VALUES, column_name):
-                        frequent_values_limit = self.scan_yml.get_frequent_values_limit(column_name)
-                        sql = (f'{group_by_cte} \n'
-                               f'SELECT value, frequency \n'
-                               f'FROM group_by_value \n'
-                               f'ORDER BY frequency DESC \n'
-                               f'{self.dialect.sql_expr_limit(scan_column.mins_maxs_limit)}\n')
-
-                        rows = self.warehouse.sql_fetchall(sql)
-                        self.queries_executed += 1
-
-                        frequent_values = [{'value': row[0], 'frequency': row[1]} for row in rows]
-                        self._log_and_append_query_measurement(
-                            measurements, Measurement(Metric.FREQUENT_VALUES, column_name, frequent_values))
-
-                self._flush_measurements(measurements)
+                        sqls.append(f'{group_by_cte} \n'
+                                    f'SELECT value \n'
+                                    f'FROM group_by_value \n'
+                                    f'ORDER BY {order_by_value_expr} ASC \n'
+                                    f'{self.dialect.sql_expr_limit(scan_column.mins_maxs_limit)}\n')
+                        query_metrics.append(Metric.MINS)
+
+                    if scan_column.is_metric_enabled(Metric.MAXS) and order_by_value_expr:
+                        sqls.append(f'{group_by_cte} \n'
+                                    f'SELECT value \n'
+                                    f'FROM group_by_value \n'
+                                    f'ORDER BY {order_by_value_expr} DESC \n'
+                                    f'{self.dialect.sql_expr_limit(scan_column.mins_maxs_limit)}\n')
+                        query_metrics.append(Metric.MAXS)
+
+                    if scan_column.is_metric_enabled(Metric.FREQUENT_VALUES):
+                        sqls.append(f'{group_by_cte} \n'
+                                    f'SELECT value, frequency \n'
+                                    f'FROM group_by_value \n'
+                                    f'ORDER BY frequency DESC \n'
+                                    f'{self.dialect.sql_expr_limit(scan_column.mins_maxs_limit)}\n')
+                        query_metrics.append(Metric.FREQUENT_VALUES)
+
+                    query_results = self.warehouse.sql_fetchall_multi(sqls) if sqls else []
+                    self.queries_executed += len(sqls)
+
+                    for query_metric, rows in zip(query_metrics, query_results):
+                        if query_metric == Metric.DISTINCT:
+                            query_result_tuple = rows[0]
+                            distinct_count = query_result_tuple[0]
+                            unique_count = query_result_tuple[1]
+                            valid_count = query_result_tuple[2] if query_result_tuple[2] else 0
+                            duplicate_count = distinct_count - unique_count
+
+                            self._log_and_append_query_measurement(
+                                measurements, Measurement(Metric.DISTINCT, column_name, distinct_count))
+                            self._log_and_append_query_measurement(
+                                measurements, Measurement(Metric.UNIQUE_COUNT, column_name, unique_count))
+
+                            derived_measurements = [Measurement(Metric.DUPLICATE_COUNT, column_name, duplicate_count)]
+                            if valid_count > 1:
+                                uniqueness = (distinct_count - 1) * 100 / (valid_count - 1)
+                                derived_measurements.append(Measurement(Metric.UNIQUENESS, column_name, uniqueness))
+                            self._log_and_append_derived_measurements(measurements, derived_measurements)
+
+                        elif query_metric == Metric.FREQUENT_VALUES:
+                            frequent_values = [{'value': row[0], 'frequency': row[1]} for row in rows]
+                            self._log_and_append_query_measurement(
+                                measurements, Measurement(Metric.FREQUENT_VALUES, column_name, frequent_values))
+
+                        else:
+                            values = [row[0] for row in rows]
+                            self._log_and_append_query_measurement(measurements,
+                                                                   Measurement(query_metric, column_name, values))
+
+                group_by_measurements.extend(measurements)
             except Exception as e:
                 self.scan_result.add_error(ScanError(f'Exception during column group by value queries', e))
+        self._flush_measurements(group_by_measurements)
 
     def _query_histograms(self):
         measurements = []
@@ -425,9 +559,9 @@ class Scan:
 
                         self._log_and_append_query_measurement(measurements,
                                                                Measurement(Metric.HISTOGRAM, column_name, histogram))
-                    self._flush_measurements(measurements)
             except Exception as e:
                 self.scan_result.add_error(ScanError(f'Exception during histogram query for {column_name}', e))
+        self._flush_measurements(measurements)
 
     def _query_sql_metrics_and_run_tests(self):
         self._query_sql_metrics_and_run_tests_base(self.scan_yml.sql_metric_ymls)
@@ -613,12 +747,10 @@ class Scan:
             self.scan_result.add_error(ScanError(f'Exception during sql metric failed rows query {resolved_sql}', e))
 
     def _get_test_variables(self, scan_column: Optional[ScanColumn] = None):
-        column_name_lower = scan_column.column_name_lower if scan_column is not None else None
-        return {
-            measurement.metric: measurement.value
-            for measurement in self.scan_result.measurements
-            if measurement.column_name is None or measurement.column_name.lower() == column_name_lower
-        }
+        test_variables = dict(self.measurement_values_by_column.get(None, {}))
+        if scan_column is not None:
+            test_variables.update(self.measurement_values_by_column.get(scan_column.column_name_lower, {}))
+        return test_variables
 
     def _run_table_tests(self):
         test_variables = self._get_test_variables()
@@ -691,6 +823,9 @@ class Scan:
         Adds the measurements to the scan result and sends the measurements to the Soda Server if that's configured
         """
         self.scan_result.measurements.extend(measurements)
+        for measurement in measurements:
+            column_name_lower = measurement.column_name.lower() if measurement.column_name is not None else None
+            self.measurement_values_by_column.setdefault(column_name_lower, {})[measurement.metric] = measurement.value
         if self.soda_server_client and measurements:
             measurement_jsons = [measurement.to_json() for measurement in measurements]
             try:
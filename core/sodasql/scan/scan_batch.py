@@ -0,0 +1,88 @@
+#  Copyright 2020 Soda
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#   http://www.apache.org/licenses/LICENSE-2.0
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+import logging
+from typing import Dict, List
+
+from sodasql.scan.scan import Scan
+from sodasql.scan.scan_result import ScanResult
+from sodasql.scan.warehouse import Warehouse
+
+
+class ScanBatch:
+    """
+    Executes multiple scans, submitting the aggregation queries of all scans before waiting for the
+    first result. On warehouses that support asynchronous queries (like Snowflake), the aggregation
+    queries run in parallel and the total time is close to the slowest aggregation instead of the sum.
+    The column metadata of scans on the same warehouse is prefetched with a single query.
+    The other queries of each scan are executed one scan after another like in Scan.execute():
+
+    scans = [scan_builder.build() for scan_builder in scan_builders]
+    scan_results = ScanBatch(scans).run()
+    """
+
+    def __init__(self, scans: List[Scan]):
+        self.scans = scans
+
+    def run(self) -> List[ScanResult]:
+        # Scans can share a warehouse so warehouses are only closed after all scans are done
+        warehouses_to_close = []
+        for scan in self.scans:
+            if scan.close_warehouse and all(scan.warehouse is not warehouse for warehouse in warehouses_to_close):
+                warehouses_to_close.append(scan.warehouse)
+            scan.close_warehouse = False
+
+        prefetched_warehouses = self._prefetch_columns_metadata()
+        try:
+            for scan in self.scans:
+                scan._start_execution(async_aggregations=True)
+            return [scan._complete_execution() for scan in self.scans]
+        finally:
+            # Later scans on these warehouses should not see metadata that can get stale
+            for warehouse in prefetched_warehouses:
+                warehouse.columns_metadata_by_table = None
+            for warehouse in warehouses_to_close:
+                warehouse.close()
+
+    def _prefetch_columns_metadata(self) -> List[Warehouse]:
+        """
+        Prefetches the column metadata of the scanned tables with a single query for each database that is
+        queried by multiple scans so that the scans don't each have to query the metadata of their table.
+        ScanBuilder creates a Warehouse per scan, so scans are grouped on the dialect connection key instead
+        of on the Warehouse objects.  Returns the warehouses with prefetched metadata.
+        """
+        scans_by_key: Dict[tuple, List[Scan]] = {}
+        for scan in self.scans:
+            warehouse = scan.warehouse
+            dialect = warehouse.dialect
+            if warehouse.columns_metadata_by_table is None and dialect.sql_all_columns_metadata_query():
+                connection_key = dialect.connection_key()
+                if connection_key is not None:
+                    scans_by_key.setdefault((type(dialect), connection_key), []).append(scan)
+
+        prefetched_warehouses = []
+        for scans in scans_by_key.values():
+            if len(scans) > 1:
+                warehouses = []
+                table_names = []
+                for scan in scans:
+                    if all(scan.warehouse is not warehouse for warehouse in warehouses):
+                        warehouses.append(scan.warehouse)
+                    if scan.scan_yml.table_name not in table_names:
+                        table_names.append(scan.scan_yml.table_name)
+                try:
+                    warehouses[0].prefetch_columns_metadata(table_names)
+                except Exception as e:
+                    logging.debug(f'Prefetching the column metadata failed, scans will query it per table: {str(e)}')
+                    continue
+                for warehouse in warehouses[1:]:
+                    warehouse.columns_metadata_by_table = warehouses[0].columns_metadata_by_table
+                prefetched_warehouses.extend(warehouses)
+        return prefetched_warehouses
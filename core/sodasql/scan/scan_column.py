@@ -8,7 +8,8 @@
 #  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
-from typing import List, Optional
+import sys
+from typing import Dict, FrozenSet, List, Optional, Tuple
 
 from sodasql.scan.column_metadata import ColumnMetadata
 from sodasql.scan.dialect import Dialect
@@ -19,6 +20,29 @@ from sodasql.scan.scan_yml_column import ScanYmlColumn
 from sodasql.scan.validity import Validity
 
 
+QUALIFIED_REGEXES_CACHE_SIZE = 256
+
+# maps (dialect type, regex) to the qualified regex, see _qualify_regex
+_QUALIFIED_REGEXES: Dict[Tuple[type, str], str] = {}
+
+
+def _qualify_regex(dialect: Dialect, regex: str) -> str:
+    """
+    The same missing and validity formats and regexes are typically configured on many columns.
+    Qualifying a regex doesn't depend on the connection configuration, so the cache is keyed on the
+    dialect type. That way dialects of the same type share entries and the cache doesn't keep dialect
+    instances and their credentials alive.
+    """
+    key = (type(dialect), regex)
+    qualified_regex = _QUALIFIED_REGEXES.get(key)
+    if qualified_regex is None:
+        if len(_QUALIFIED_REGEXES) >= QUALIFIED_REGEXES_CACHE_SIZE:
+            _QUALIFIED_REGEXES.clear()
+        qualified_regex = dialect.qualify_regex(regex)
+        _QUALIFIED_REGEXES[key] = qualified_regex
+    return qualified_regex
+
+
 class ScanColumn:
     """
     Contains column information used during the scan.
@@ -32,28 +56,30 @@ class ScanColumn:
         self.column = column_metadata
         self.column_name = column_metadata.name
         self.column_name_lower = self.column_name.lower()
-        self.scan_yml_column: ScanYmlColumn = \
-            self.scan_yml.get_scan_yaml_column(self.column_name)
+        # scan yml column keys are lower case, so this is the only lookup of the column configuration
+        self.scan_yml_column: ScanYmlColumn = self.scan_yml.columns.get(self.column_name_lower)
+        # table level and column level metrics enabled for this column
+        self.enabled_metrics: FrozenSet[str] = self.scan_yml.get_enabled_metrics(self.column_name)
 
         dialect = self.scan.dialect
         self.qualified_column_name = dialect.qualify_column_name(self.column_name)
-        self.is_text: bool = dialect.is_text(column_metadata.type)
-        self.is_number: bool = dialect.is_number(column_metadata.type)
-        self.is_time: bool = dialect.is_time(column_metadata.type)
-        self.is_supported: bool = dialect.is_supported(column_metadata.type)
+        # dialects compare the upper case column type, so the type is upper cased only once
+        column_type = sys.intern(column_metadata.type.upper())
+        self.is_text: bool = dialect.is_text(column_type)
+        self.is_number: bool = dialect.is_number(column_type)
+        self.is_time: bool = dialect.is_time(column_type)
+        self.is_supported: bool = dialect.is_supported(column_type)
 
         if self.is_supported:
-            self.missing = self.scan_yml.get_missing(self.column_name)
-            self.is_missing_metric_enabled = self.scan_yml.is_any_metric_enabled(
+            self.missing = self.scan_yml_column.missing if self.scan_yml_column else None
+            self.is_missing_metric_enabled = self.is_any_metric_enabled(
                 [Metric.MISSING_COUNT, Metric.MISSING_PERCENTAGE,
-                 Metric.VALUES_COUNT, Metric.VALUES_PERCENTAGE],
-                self.column_name)
+                 Metric.VALUES_COUNT, Metric.VALUES_PERCENTAGE])
 
-            self.validity = self.scan_yml.get_validity(self.column_name)
-            self.is_validity_metric_enabled = self.scan_yml.is_any_metric_enabled(
+            self.validity = self.scan_yml_column.validity if self.scan_yml_column else None
+            self.is_validity_metric_enabled = self.is_any_metric_enabled(
                 [Metric.INVALID_COUNT, Metric.INVALID_PERCENTAGE,
-                 Metric.VALID_COUNT, Metric.VALID_PERCENTAGE],
-                self.column_name)
+                 Metric.VALID_COUNT, Metric.VALID_PERCENTAGE])
 
             self.missing_condition, self.is_default_missing_condition = \
                 self.__get_missing_condition(column_metadata, self.missing, dialect)
@@ -65,10 +91,10 @@ class ScanColumn:
             self.is_default_non_missing_and_valid_condition = \
                 self.is_default_missing_condition and self.is_default_valid_condition
 
-            self.validity_format = self.scan_yml.get_validity_format(column_metadata)
+            self.validity_format = self.validity.format if self.validity and self.validity.format else None
             self.is_valid_enabled = \
                 (self.validity is not None or self.is_validity_metric_enabled) \
-                or self.scan_yml.is_any_metric_enabled([Metric.DISTINCT, Metric.UNIQUENESS], self.column_name)
+                or self.is_any_metric_enabled([Metric.DISTINCT, Metric.UNIQUENESS])
 
             self.is_missing_enabled = self.is_valid_enabled or self.is_missing_metric_enabled
 
@@ -100,24 +126,13 @@ class ScanColumn:
             self.mins_maxs_limit = self.scan_yml.get_mins_maxs_limit(self.column_name)
 
     def is_any_metric_enabled(self, metrics: List[str]):
-        for metric in metrics:
-            if self.is_metric_enabled(metric):
-                return True
-        return False
+        return not self.enabled_metrics.isdisjoint(metrics)
 
     def is_metric_enabled(self, metric: str):
-        if self.scan_yml_column \
-            and self.scan_yml_column \
-            and metric in self.scan_yml_column.metrics:
-            return True
-        if self.scan_yml \
-            and self.scan_yml.metrics \
-            and metric in self.scan_yml.metrics:
-            return True
-
-    @classmethod
-    def __get_missing_condition(cls, column_metadata: ColumnMetadata, missing: Missing, dialect: Dialect):
-        qualified_column_name = dialect.qualify_column_name(column_metadata.name)
+        return metric in self.enabled_metrics
+
+    def __get_missing_condition(self, column_metadata: ColumnMetadata, missing: Missing, dialect: Dialect):
+        qualified_column_name = self.qualified_column_name
         validity_clauses = [f'{qualified_column_name} IS NULL']
         if missing:
             if missing.values:
@@ -125,32 +140,34 @@ class ScanColumn:
                 validity_clauses.append(f'{qualified_column_name} IN {sql_expr_missing_values}')
             if missing.format:
                 format_regex = Missing.FORMATS.get(missing.format)
-                qualified_regex = dialect.qualify_regex(format_regex)
+                qualified_regex = _qualify_regex(dialect, format_regex)
                 validity_clauses.append(dialect.sql_expr_regexp_like(qualified_column_name, qualified_regex))
             if missing.regex:
-                qualified_regex = dialect.qualify_regex(missing.regex)
+                qualified_regex = _qualify_regex(dialect, missing.regex)
                 validity_clauses.append(dialect.sql_expr_regexp_like(qualified_column_name, qualified_regex))
         return " OR ".join(validity_clauses), len(validity_clauses) == 1
 
     def __get_valid_condition(self, column_metadata: ColumnMetadata, validity: Validity, dialect: Dialect):
-        qualified_column_name = dialect.qualify_column_name(column_metadata.name)
+        qualified_column_name = self.qualified_column_name
         if validity is None:
             return '', True
         validity_clauses = []
         if validity.format is not None and self.is_text:
             format_regex = Validity.FORMATS.get(validity.format)
-            qualified_regex = dialect.qualify_regex(format_regex)
+            qualified_regex = _qualify_regex(dialect, format_regex)
             validity_clauses.append(dialect.sql_expr_regexp_like(qualified_column_name, qualified_regex))
         if validity.regex is not None and self.is_text:
-            qualified_regex = dialect.qualify_regex(validity.regex)
+            qualified_regex = _qualify_regex(dialect, validity.regex)
             validity_clauses.append(dialect.sql_expr_regexp_like(qualified_column_name, qualified_regex))
         if validity.values is not None:
             valid_values_sql = dialect.sql_expr_list(column_metadata, validity.values)
             validity_clauses.append(dialect.sql_expr_in(qualified_column_name, valid_values_sql))
-        if validity.min_length is not None and self.is_text:
-            validity_clauses.append(f'{dialect.sql_expr_length(qualified_column_name)} >= {validity.min_length}')
-        if validity.max_length is not None and self.is_text:
-            validity_clauses.append(f'{dialect.sql_expr_length(qualified_column_name)} <= {validity.max_length}')
+        if (validity.min_length is not None or validity.max_length is not None) and self.is_text:
+            length_expr = dialect.sql_expr_length(qualified_column_name)
+            if validity.min_length is not None:
+                validity_clauses.append(f'{length_expr} >= {validity.min_length}')
+            if validity.max_length is not None:
+                validity_clauses.append(f'{length_expr} <= {validity.max_length}')
         if validity.min is not None and self.is_number:
             validity_clauses.append(f'{qualified_column_name} >= {validity.min}')
         if validity.max is not None:
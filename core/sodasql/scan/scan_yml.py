@@ -8,7 +8,7 @@
 #  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
-from typing import List, Optional, Set
+from typing import FrozenSet, List, Optional, Set
 
 from jinja2 import Template
 
@@ -45,6 +45,9 @@ class ScanYml:
     def is_metric_enabled(self, metric: str, column_name: Optional[str] = None):
         return metric in self.__get_metrics(column_name)
 
+    def get_enabled_metrics(self, column_name: Optional[str] = None) -> FrozenSet[str]:
+        return frozenset(self.__get_metrics(column_name))
+
     def __get_metrics(self, column_name: Optional[str] = None) -> Set[str]:
         metrics = self.metrics.copy()
         if column_name:
@@ -8,12 +8,16 @@
 #  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
+import logging
+import os
 import re
-from typing import List, Optional, Set
+import sys
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
 
-from jinja2 import Template
+from jinja2 import BaseLoader, Environment, FileSystemBytecodeCache, Template
 
-from sodasql.scan.file_system import FileSystemSingleton
+from sodasql.scan.file_system import FileSystem, FileSystemSingleton
 from sodasql.scan.metric import Metric
 from sodasql.scan.missing import Missing
 from sodasql.scan.parser import Parser
@@ -37,9 +41,9 @@ KEY_SAMPLE_METHOD = 'sample_method'
 KEY_FILTER = 'filter'
 KEY_SAMPLES = 'samples'
 
-VALID_SCAN_YML_KEYS = [KEY_TABLE_NAME, KEY_METRICS, KEY_METRIC_GROUPS, KEY_SQL_METRICS,
-                       KEY_TESTS, KEY_COLUMNS, KEY_MINS_MAXS_LIMIT, KEY_FREQUENT_VALUES_LIMIT,
-                       KEY_SAMPLE_PERCENTAGE, KEY_SAMPLE_METHOD, KEY_FILTER, KEY_SAMPLES]
+VALID_SCAN_YML_KEYS = frozenset([KEY_TABLE_NAME, KEY_METRICS, KEY_METRIC_GROUPS, KEY_SQL_METRICS,
+                                 KEY_TESTS, KEY_COLUMNS, KEY_MINS_MAXS_LIMIT, KEY_FREQUENT_VALUES_LIMIT,
+                                 KEY_SAMPLE_PERCENTAGE, KEY_SAMPLE_METHOD, KEY_FILTER, KEY_SAMPLES])
 
 COLUMN_KEY_METRICS = KEY_METRICS
 COLUMN_KEY_METRIC_GROUPS = KEY_METRIC_GROUPS
@@ -73,12 +77,30 @@ COLUMN_VALID_KEYS = [
     COLUMN_KEY_VALID_MIN_LENGTH,
     COLUMN_KEY_VALID_MAX_LENGTH]
 
-VALID_COLUMN_KEYS = COLUMN_MISSING_KEYS + COLUMN_VALID_KEYS + [
+COLUMN_MISSING_KEYS_SET = frozenset(COLUMN_MISSING_KEYS)
+COLUMN_VALID_KEYS_SET = frozenset(COLUMN_VALID_KEYS)
+
+# Maps the Missing and Validity attribute names to their column configuration keys
+COLUMN_MISSING_ATTRIBUTES = (
+    ('values', COLUMN_KEY_MISSING_VALUES),
+    ('format', COLUMN_KEY_MISSING_FORMAT),
+    ('regex', COLUMN_KEY_MISSING_REGEX))
+
+COLUMN_VALID_ATTRIBUTES = (
+    ('format', COLUMN_KEY_VALID_FORMAT),
+    ('regex', COLUMN_KEY_VALID_REGEX),
+    ('values', COLUMN_KEY_VALID_VALUES),
+    ('min', COLUMN_KEY_VALID_MIN),
+    ('max', COLUMN_KEY_VALID_MAX),
+    ('min_length', COLUMN_KEY_VALID_MIN_LENGTH),
+    ('max_length', COLUMN_KEY_VALID_MAX_LENGTH))
+
+VALID_COLUMN_KEYS = frozenset(COLUMN_MISSING_KEYS + COLUMN_VALID_KEYS + [
     COLUMN_KEY_METRICS,
     COLUMN_KEY_METRIC_GROUPS,
     COLUMN_KEY_SQL_METRICS,
     COLUMN_KEY_TESTS,
-    COLUMN_KEY_SAMPLES]
+    COLUMN_KEY_SAMPLES])
 
 SAMPLES_KEY_DATASET_LIMIT = 'table_limit'
 SAMPLES_KEY_DATASET_TABLESAMPLE = 'table_tablesample'
@@ -97,12 +119,134 @@ SQL_METRIC_KEY_TESTS = KEY_TESTS
 SQL_METRIC_KEY_GROUP_FIELDS = 'group_fields'
 SQL_METRIC_KEY_FAILED_LIMIT = SAMPLES_KEY_FAILED_LIMIT
 
-VALID_SQL_METRIC_KEYS = [SQL_METRIC_KEY_SQL, SQL_METRIC_KEY_METRIC_NAMES, SQL_METRIC_KEY_TESTS,
-                         SQL_METRIC_KEY_SQL_FILE, SQL_METRIC_KEY_GROUP_FIELDS, SQL_METRIC_KEY_FAILED_LIMIT]
+VALID_SQL_METRIC_KEYS = frozenset([SQL_METRIC_KEY_SQL, SQL_METRIC_KEY_METRIC_NAMES, SQL_METRIC_KEY_TESTS,
+                                   SQL_METRIC_KEY_SQL_FILE, SQL_METRIC_KEY_GROUP_FIELDS, SQL_METRIC_KEY_FAILED_LIMIT])
+
+# Valid python identifiers
+_IDENTIFIER_PATTERN = re.compile(r'[^\d\W]\w*\Z')
+
+
+class _FilterLoader(BaseLoader):
+    """
+    Uses the template name as the template source.  Loading filters through a loader
+    instead of Environment.from_string is what makes Jinja use the bytecode cache.
+    """
+
+    def get_source(self, environment, template):
+        return template, None, lambda: True
+
+
+@lru_cache(maxsize=1)
+def _get_filter_environment() -> Environment:
+    """
+    The filter environment persists compiled filters in ~/.soda/jinja_cache so that
+    subsequent soda scan invocations can skip the Jinja lexing, parsing and codegen.
+    """
+    file_system = FileSystemSingleton.INSTANCE
+    cache_dir = file_system.join(file_system.user_home_dir(), '.soda', 'jinja_cache')
+    bytecode_cache = None
+    try:
+        file_system.mkdirs(cache_dir)
+        if os.access(cache_dir, os.W_OK):
+            bytecode_cache = FileSystemBytecodeCache(directory=cache_dir)
+    except Exception as e:
+        logging.debug(f"Couldn't use Jinja bytecode cache {cache_dir}: {str(e)}")
+    return Environment(loader=_FilterLoader(), bytecode_cache=bytecode_cache)
+
+
+@lru_cache(maxsize=256)
+def _compile_filter(filter: str) -> Template:
+    """
+    Compiles the filter into a Jinja template. The same filter is typically used in
+    many scans, so compiled templates are cached and shared between parsers.
+    """
+    return _get_filter_environment().get_template(filter)
+
+
+_METRIC_GROUP_SETS = {metric_group_name: frozenset(group_metrics)
+                      for metric_group_name, group_metrics in Metric.METRIC_GROUPS.items()}
+
+
+def _build_metric_to_groups() -> Dict[str, FrozenSet[str]]:
+    metric_to_groups: Dict[str, Set[str]] = {}
+    for metric_group_name, group_metrics in Metric.METRIC_GROUPS.items():
+        for metric in group_metrics:
+            metric_to_groups.setdefault(metric, set()).add(metric_group_name)
+    return {metric: frozenset(metric_group_names) for metric, metric_group_names in metric_to_groups.items()}
+
+
+# maps metrics to the names of the metric groups they belong to
+_METRIC_TO_GROUPS = _build_metric_to_groups()
+
+
+@lru_cache(maxsize=128)
+def _resolve_metrics(metrics: FrozenSet[str], metrics_groups: FrozenSet[str]) -> FrozenSet[str]:
+    """
+    Expands the configured metrics and metric groups into all the metrics that have to be computed.
+    Scan configurations repeat the same metrics for many columns, so the expansion is cached.
+    """
+    # Add special case for all
+    if Metric.METRIC_GROUP_ALL in metrics_groups:
+        return metrics | Metric.METRIC_TYPES
+
+    resolved_metrics: Set[str] = set(metrics)
+    resolved_metrics_groups: Set[str] = set(metrics_groups)
+
+    for metric in metrics:
+        resolved_metrics_groups.update(_METRIC_TO_GROUPS.get(metric, ()))
+
+    if Metric.METRIC_GROUP_VALIDITY in resolved_metrics_groups:
+        resolved_metrics_groups.add(Metric.METRIC_GROUP_MISSING)
+
+    if Metric.METRIC_GROUP_MISSING in resolved_metrics_groups:
+        resolved_metrics.add(Metric.ROW_COUNT)
+
+    for metric_group_name in resolved_metrics_groups:
+        group_metrics = _METRIC_GROUP_SETS.get(metric_group_name)
+        if group_metrics:
+            resolved_metrics.update(group_metrics)
+
+    if Metric.HISTOGRAM in resolved_metrics:
+        resolved_metrics.add(Metric.MIN)
+        resolved_metrics.add(Metric.MAX)
+
+    return frozenset(resolved_metrics)
+
+
+# maps sql file paths to their modification time and contents, see _read_sql_file
+_SQL_FILES_BY_PATH: Dict[str, Tuple[float, str]] = {}
+
+
+def _read_sql_file(file_system: FileSystem, sql_file_path: str) -> Optional[str]:
+    """
+    SQL files are often shared between many scan files, so their contents are cached.
+    Files are read again when their modification time changes.  Failed reads are not
+    cached because they can be transient.
+    """
+    modification_time = file_system.file_modification_time(sql_file_path)
+    if modification_time is None:
+        return file_system.file_read_as_str(sql_file_path)
+    cached = _SQL_FILES_BY_PATH.get(sql_file_path)
+    if cached is not None and cached[0] == modification_time:
+        return cached[1]
+    sql = file_system.file_read_as_str(sql_file_path)
+    if sql is not None:
+        _SQL_FILES_BY_PATH[sql_file_path] = (modification_time, sql)
+    return sql
 
 
 class ScanYmlParser(Parser):
 
+    __slots__ = ('scan_yaml_path', 'scan_yml')
+
+    # Maps the sql metric types to the names of their parse methods.  The methods are looked up by name
+    # so that subclasses can override them.
+    _SQL_METRIC_PARSE_METHODS = {
+        'failed_rows': 'parse_sql_metric_failed_rows',
+        'numeric': 'parse_sql_metric',
+        'numeric_groups': 'parse_sql_metric'
+    }
+
     def __init__(self,
                  scan_yml_dict: dict,
                  scan_yml_path: str = 'scan'):
@@ -135,7 +279,7 @@ class ScanYmlParser(Parser):
         if filter:
             try:
                 self.scan_yml.filter = filter
-                self.scan_yml.filter_template = Template(filter)
+                self.scan_yml.filter_template = _compile_filter(filter)
             except Exception as e:
                 self.error(f"Couldn't parse filter '{filter}': {str(e)}", KEY_FILTER)
 
@@ -145,40 +289,16 @@ class ScanYmlParser(Parser):
         metrics: Set[str] = set(self.get_list_optional(KEY_METRICS, []))
         metrics_groups: Set[str] = set(self.get_list_optional(KEY_METRIC_GROUPS, []))
 
-        self._push_context(metrics, KEY_METRICS)
+        with self._context(metrics, KEY_METRICS):
+            if Metric.METRIC_GROUP_ALL not in metrics_groups:
+                for metric_group_name in metrics_groups:
+                    if metric_group_name not in Metric.METRIC_GROUPS:
+                        self.warning(f'Invalid metric_group {metric_group_name}')
 
-        # Add special case for all
-        if Metric.METRIC_GROUP_ALL in metrics_groups:
-            metrics.update(Metric.METRIC_TYPES)
-        else:
-            for metric_group_name in Metric.METRIC_GROUPS:
-                group_metrics = Metric.METRIC_GROUPS[metric_group_name]
-                for metric in metrics:
-                    if metric in group_metrics:
-                        metrics_groups.add(metric_group_name)
-
-            if Metric.METRIC_GROUP_VALIDITY in metrics_groups:
-                metrics_groups.add(Metric.METRIC_GROUP_MISSING)
-
-            if Metric.METRIC_GROUP_MISSING in metrics_groups:
-                metrics.add(Metric.ROW_COUNT)
-
-            for metric_group_name in metrics_groups:
-                if metric_group_name in Metric.METRIC_GROUPS:
-                    for group_metric in Metric.METRIC_GROUPS[metric_group_name]:
-                        metrics.add(group_metric)
-                else:
-                    self.warning(f'Invalid metric_group {metric_group_name}')
-
-            if Metric.HISTOGRAM in metrics:
-                metrics.add(Metric.MIN)
-                metrics.add(Metric.MAX)
+            self.check_invalid_keys(Metric.METRIC_TYPES)
 
-        self.check_invalid_keys(Metric.METRIC_TYPES)
-
-        self._pop_context()
-
-        return metrics
+        # Callers add and remove metrics, so they get their own copy of the cached resolution
+        return set(_resolve_metrics(frozenset(metrics), frozenset(metrics_groups)))
 
     def ensure_metric(self,
                       metrics: Set[str],
@@ -220,124 +340,111 @@ class ScanYmlParser(Parser):
 
     def parse_columns(self, scan_configuration: ScanYml) -> dict:
         columns_dict = self.get_dict_optional(KEY_COLUMNS, {})
-        self._push_context(columns_dict, KEY_COLUMNS)
 
         scan_configuration_columns = {}
+        validity_formats = Validity.FORMATS
 
-        for column_name in columns_dict:
-            column_dict = columns_dict.get(column_name)
-            if not isinstance(column_dict, dict):
-                self.error(f'Column {column_name} should be an object, not a {type(column_dict)}', KEY_COLUMNS)
-            else:
-                self._push_context(column_dict, column_name)
-
-                metrics: Set[str] = self.parse_metrics()
-
-                if self.remove_metric(metrics, Metric.ROW_COUNT):
-                    self.ensure_metric(scan_configuration.metrics, Metric.ROW_COUNT,
-                                       f'{Metric.ROW_COUNT} {column_name}')
-
-                missing = None
-                if any(cfg in column_dict.keys() for cfg in COLUMN_MISSING_KEYS):
-                    missing = Missing()
-                    missing.values = column_dict.get(COLUMN_KEY_MISSING_VALUES)
-                    missing.format = column_dict.get(COLUMN_KEY_MISSING_FORMAT)
-                    missing.regex = column_dict.get(COLUMN_KEY_MISSING_REGEX)
-
-                validity = None
-
-                if any(cfg in column_dict.keys() for cfg in COLUMN_VALID_KEYS):
-                    validity = Validity()
-                    validity.format = column_dict.get(COLUMN_KEY_VALID_FORMAT)
-                    if validity.format is not None and Validity.FORMATS.get(validity.format) is None:
-                        self.warning(f'Invalid {column_name}.{COLUMN_KEY_VALID_FORMAT}: {validity.format}')
-                    validity.regex = column_dict.get(COLUMN_KEY_VALID_REGEX)
-                    validity.values = column_dict.get(COLUMN_KEY_VALID_VALUES)
-                    validity.min = column_dict.get(COLUMN_KEY_VALID_MIN)
-                    validity.max = column_dict.get(COLUMN_KEY_VALID_MAX)
-                    validity.min_length = column_dict.get(COLUMN_KEY_VALID_MIN_LENGTH)
-                    validity.max_length = column_dict.get(COLUMN_KEY_VALID_MAX_LENGTH)
-
-                sql_metric_ymls = self.parse_sql_metric_ymls(metrics_key=COLUMN_KEY_SQL_METRICS,
-                                                             column_name=column_name)
-
-                tests = self.parse_tests(column_dict,
-                                         COLUMN_KEY_TESTS,
-                                         context_table_name=scan_configuration.table_name,
-                                         context_column_name=column_name)
-
-                samples_yml = self.parse_samples_yml(COLUMN_KEY_SAMPLES)
-                if samples_yml and samples_yml.table_limit:
-                    self.warning(f"Invalid column samples key 'table_limit'")
-                if samples_yml and samples_yml.table_tablesample:
-                    self.warning(f"Invalid column samples key 'table_tablesample'")
-
-                self.check_invalid_keys(VALID_COLUMN_KEYS)
-
-                column_name_lower = column_name.lower()
-                scan_configuration_columns[column_name_lower] = ScanYmlColumn(
-                    metrics=metrics,
-                    sql_metric_ymls=sql_metric_ymls,
-                    missing=missing,
-                    validity=validity,
-                    tests=tests,
-                    samples_yml=samples_yml)
-
-                self._pop_context()
-
-        self._pop_context()
+        with self._context(columns_dict, KEY_COLUMNS):
+            for column_name, column_dict in columns_dict.items():
+                if not isinstance(column_dict, dict):
+                    self.error(f'Column {column_name} should be an object, not a {type(column_dict)}',
+                               KEY_COLUMNS)
+                else:
+                    with self._context(column_dict, column_name):
+                        metrics: Set[str] = self.parse_metrics()
+
+                        if self.remove_metric(metrics, Metric.ROW_COUNT):
+                            self.ensure_metric(scan_configuration.metrics, Metric.ROW_COUNT,
+                                               f'{Metric.ROW_COUNT} {column_name}')
+
+                        missing = None
+                        if not COLUMN_MISSING_KEYS_SET.isdisjoint(column_dict):
+                            missing = Missing()
+                            for attribute_name, key in COLUMN_MISSING_ATTRIBUTES:
+                                setattr(missing, attribute_name, column_dict.get(key))
+
+                        validity = None
+
+                        if not COLUMN_VALID_KEYS_SET.isdisjoint(column_dict):
+                            validity = Validity()
+                            for attribute_name, key in COLUMN_VALID_ATTRIBUTES:
+                                setattr(validity, attribute_name, column_dict.get(key))
+                            if validity.format is not None and validity_formats.get(validity.format) is None:
+                                self.warning(f'Invalid {column_name}.{COLUMN_KEY_VALID_FORMAT}: {validity.format}')
+
+                        sql_metric_ymls = self.parse_sql_metric_ymls(metrics_key=COLUMN_KEY_SQL_METRICS,
+                                                                     column_name=column_name)
+
+                        tests = self.parse_tests(column_dict,
+                                                 COLUMN_KEY_TESTS,
+                                                 context_table_name=scan_configuration.table_name,
+                                                 context_column_name=column_name)
+
+                        samples_yml = self.parse_samples_yml(COLUMN_KEY_SAMPLES)
+                        if samples_yml and samples_yml.table_limit:
+                            self.warning(f"Invalid column samples key 'table_limit'")
+                        if samples_yml and samples_yml.table_tablesample:
+                            self.warning(f"Invalid column samples key 'table_tablesample'")
+
+                        self.check_invalid_keys(VALID_COLUMN_KEYS)
+
+                        # Interned as the scan looks up the column configurations by lower case name many times
+                        column_name_lower = sys.intern(column_name.lower())
+                        scan_configuration_columns[column_name_lower] = ScanYmlColumn(
+                            metrics=metrics,
+                            sql_metric_ymls=sql_metric_ymls,
+                            missing=missing,
+                            validity=validity,
+                            tests=tests,
+                            samples_yml=samples_yml)
 
         return scan_configuration_columns
 
     def parse_sql_metric_ymls(self, metrics_key: str, column_name: Optional[str] = None) -> List[SqlMetricYml]:
         sql_metrics_dicts: List[dict] = self.get_list_optional(metrics_key, [])
         if isinstance(sql_metrics_dicts, list):
-            self._push_context(sql_metrics_dicts, metrics_key)
-            try:
+            # Most scans and columns don't have sql metrics
+            if not sql_metrics_dicts:
+                return []
+            with self._context(sql_metrics_dicts, metrics_key):
                 sql_metric_ymls = []
-                for i in range(len(sql_metrics_dicts)):
-                    sql_metric_dict = sql_metrics_dicts[i]
+                for i, sql_metric_dict in enumerate(sql_metrics_dicts):
                     if isinstance(sql_metric_dict, dict):
                         metric_type = sql_metric_dict.get(SQL_METRIC_KEY_TYPE, 'numeric')
                         metric_group_fields = sql_metric_dict.get(SQL_METRIC_KEY_GROUP_FIELDS)
                         if metric_group_fields:
                             metric_type = 'numeric_groups'
 
-                        self._push_context(object=sql_metric_dict, name=i)
-                        try:
-                            sql_metric_yml = None
-
-                            if metric_type == 'failed_rows':
-                                sql_metric_yml = self.parse_sql_metric_failed_rows(
-                                    metric_type,
-                                    sql_metric_index=i,
-                                    column_name=column_name)
-
-                            elif metric_type.startswith('numeric'):
-                                sql_metric_yml = self.parse_sql_metric(
+                        with self._context(sql_metric_dict, i):
+                            parse_method_name = self._get_sql_metric_parse_method_name(metric_type)
+                            if parse_method_name:
+                                sql_metric_yml = getattr(self, parse_method_name)(
                                     sql_metric_dict=sql_metric_dict,
                                     sql_metric_type=metric_type,
                                     sql_metric_index=i,
                                     column_name=column_name)
+                                if sql_metric_yml:
+                                    sql_metric_ymls.append(sql_metric_yml)
                             else:
                                 self.error(f'Unknown sql_metric type {metric_type}')
-
-                            if sql_metric_yml:
-                                sql_metric_ymls.append(sql_metric_yml)
-
-                        finally:
-                            self._pop_context()
                     else:
                         self.error(f'Invalid YAML: SQL metric {i} was {type(sql_metric_dict)}, expected object')
 
                 return sql_metric_ymls
-            finally:
-                self._pop_context()
         elif sql_metrics_dicts is not None:
             self.error(
                 f'Invalid YAML structure near {metrics_key}: Expected list of SQL metrics, but was {type(sql_metrics_dicts)}',
                 metrics_key)
 
+    @classmethod
+    def _get_sql_metric_parse_method_name(cls, sql_metric_type) -> Optional[str]:
+        if not isinstance(sql_metric_type, str):
+            return None
+        parse_method_name = cls._SQL_METRIC_PARSE_METHODS.get(sql_metric_type)
+        if parse_method_name is None and sql_metric_type.startswith('numeric'):
+            return cls._SQL_METRIC_PARSE_METHODS['numeric']
+        return parse_method_name
+
     def parse_sql_metric(self,
                          sql_metric_dict,
                          sql_metric_type: str,
@@ -354,7 +461,7 @@ class ScanYmlParser(Parser):
         elif sql_file:
             file_system = FileSystemSingleton.INSTANCE
             sql_file_path = file_system.join(file_system.dirname(self.scan_yaml_path), sql_file)
-            sql = file_system.file_read_as_str(sql_file_path)
+            sql = _read_sql_file(file_system, sql_file_path)
 
         tests = self.parse_tests(
             sql_metric_dict,
@@ -383,7 +490,10 @@ class ScanYmlParser(Parser):
     def parse_sql_metric_failed_rows(self,
                                      sql_metric_type: str,
                                      sql_metric_index: int,
-                                     column_name: str) -> Optional[SqlMetricYml]:
+                                     column_name: str,
+                                     sql_metric_dict: Optional[dict] = None) -> Optional[SqlMetricYml]:
+        # sql_metric_dict is only there to share the signature of parse_sql_metric,
+        # the properties are read from the current context
 
         sql_metric_name = self.get_str_required(SQL_METRIC_KEY_NAME)
         if sql_metric_name is None:
@@ -391,7 +501,7 @@ class ScanYmlParser(Parser):
 
         # Only allow for valid python identifiers as the metric names in failed rows
         # TODO make this consistent with the other sql metric names
-        if not re.match(r"^[^\d\W]\w*\Z$", sql_metric_name):
+        if not _IDENTIFIER_PATTERN.match(sql_metric_name):
             self.error(f'Invalid metric identifier {sql_metric_name}', SQL_METRIC_KEY_NAME)
             return None
 
@@ -421,8 +531,7 @@ class ScanYmlParser(Parser):
     def parse_samples_yml(self, samples_key: str) -> Optional[SamplesYml]:
         samples = self.get_dict_optional(samples_key)
         if samples is not None:
-            self._push_context(samples, samples_key)
-            try:
+            with self._context(samples, samples_key):
                 samples_yml = SamplesYml(
                     table_limit=self.get_int_optional(SAMPLES_KEY_DATASET_LIMIT),
                     table_tablesample=self.get_str_optional(SAMPLES_KEY_DATASET_TABLESAMPLE),
@@ -432,6 +541,5 @@ class ScanYmlParser(Parser):
                     passed_tablesample=self.get_str_optional(SAMPLES_KEY_PASSED_TABLESAMPLE)
                 )
                 return samples_yml
-            finally:
-                self._pop_context()
         pass
+
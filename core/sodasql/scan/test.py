@@ -9,7 +9,8 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 import logging
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from types import CodeType
 from typing import Optional, List
 
 
@@ -21,12 +22,17 @@ class Test:
     expression: str
     metrics: List[str]
     column: Optional[str]
+    # compiled expression, compiled on first evaluation if not passed by the parser
+    code: Optional[CodeType] = field(default=None, repr=False, compare=False)
 
     def evaluate(self, test_variables: dict, group_values: Optional[dict] = None):
         from sodasql.scan.test_result import TestResult
         try:
-            passed = bool(eval(self.expression, test_variables))
-            values = {key: test_variables[key] for key in test_variables if key in self.metrics}
+            if self.code is None:
+                self.code = compile(self.expression, 'test', 'eval')
+            passed = bool(eval(self.code, test_variables))
+            values = {metric: test_variables[metric] for metric in self.metrics if metric in test_variables} \
+                if self.metrics else {}
             test_result = TestResult(test=self, passed=passed, values=values, group_values=group_values)
             logging.debug(str(test_result))
             return test_result
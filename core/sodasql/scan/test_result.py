@@ -9,7 +9,7 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 import json
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Optional
 
 from sodasql.common.json_helper import JsonHelper
@@ -24,33 +24,40 @@ class TestResult:
     values: Optional[dict] = None
     error: Optional[Exception] = None
     group_values: Optional[dict] = None
+    # Lazy cache of the serialized values as test results are logged and reported
+    _values_json: Optional[str] = field(default=None, init=False, repr=False, compare=False)
 
     def __str__(self):
+        if self._values_json is None:
+            self._values_json = json.dumps(JsonHelper.to_jsonnable(self.values))
         return (f'Test {self.test.title} {"passed" if self.passed else "failed"}' +
                 (f" with group values {self.group_values}" if self.group_values else '') +
-                f' with measurements {json.dumps(JsonHelper.to_jsonnable(self.values))}')
+                f' with measurements {self._values_json}')
 
     def to_json(self):
-        if not self.test or not self.test.expression:
+        test = self.test
+        if not test or not test.expression:
             return {
                 'error': 'Invalid test result'
             }
 
+        test_title = test.title
         test_result_json = {
-            'id': self.test.id,
-            'title': self.test.title,
-            'description': self.test.title, # for backwards compatibility
-            'expression': self.test.expression
+            'id': test.id,
+            'title': test_title,
+            'description': test_title, # for backwards compatibility
+            'expression': test.expression
         }
 
-        if self.test.column:
-            test_result_json['columnName'] = self.test.column
+        if test.column:
+            test_result_json['columnName'] = test.column
 
         if self.error:
             test_result_json['error'] = str(self.error)
         else:
             test_result_json['passed'] = self.passed
-            test_result_json['values'] = JsonHelper.to_jsonnable(self.values)
+            # None and empty values are already jsonnable
+            test_result_json['values'] = JsonHelper.to_jsonnable(self.values) if self.values else self.values
 
         if self.group_values:
             test_result_json['groupValues'] = JsonHelper.to_jsonnable(self.group_values)
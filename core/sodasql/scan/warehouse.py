@@ -9,19 +9,29 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 import logging
-from typing import List
+import time
+from typing import Callable, Dict, List, Optional, Tuple
 
 from sodasql.scan.db import sql_fetchone, sql_fetchall, sql_fetchone_description, sql_fetchall_description
 from sodasql.scan.dialect import Dialect
 from sodasql.scan.warehouse_yml import WarehouseYml
 
 
+# For programs that keep a Warehouse open and list its tables repeatedly, eg before each scan batch
+TABLE_NAMES_CACHE_TTL_SECONDS = 300
+
+
 class Warehouse:
 
     def __init__(self, warehouse_yml: WarehouseYml):
         self.name = warehouse_yml.name
         self.dialect: Dialect = warehouse_yml.dialect
         self.connection = self.dialect.create_connection()
+        # maps lower case table names to their column metadata tuples, see prefetch_columns_metadata
+        self.columns_metadata_by_table: Optional[Dict[str, List[tuple]]] = None
+        # maps tables metadata queries to the time they were executed and the resulting table names
+        self.table_names_by_sql: Dict[str, Tuple[float, List[str]]] = {}
+        self.table_names_cache_ttl_seconds: float = TABLE_NAMES_CACHE_TTL_SECONDS
 
     def sql_fetchone(self, sql) -> tuple:
         return sql_fetchone(self.connection, sql)
@@ -35,13 +45,60 @@ class Warehouse:
     def sql_fetchall_description(self, sql) -> tuple:
         return sql_fetchall_description(self.connection, sql)
 
+    def sql_fetchall_multi(self, sqls: List[str]) -> List[List[tuple]]:
+        return self.dialect.sql_fetchall_multi(self.connection, sqls)
+
+    def sql_fetchone_async(self, sql: str) -> Callable[[], tuple]:
+        return self.dialect.sql_fetchone_async(self.connection, sql)
+
+    def prefetch_columns_metadata(self, table_names: Optional[List[str]] = None) -> bool:
+        """
+        Fetches the column metadata of the given tables, or of all tables, with a single query instead of
+        one query per scanned table.  Scans on this warehouse use the prefetched metadata until
+        refresh_metadata() is called and query the metadata of other tables themselves.
+        Returns False if the dialect doesn't support fetching all columns at once.
+        """
+        sql = self.dialect.sql_all_columns_metadata_query(table_names)
+        if not sql:
+            return False
+        columns_metadata_by_table: Dict[str, List[tuple]] = {}
+        for table_name, column_name, data_type, is_nullable in self.sql_fetchall(sql):
+            columns_metadata_by_table.setdefault(table_name.lower(), []).append((column_name, data_type, is_nullable))
+        self.columns_metadata_by_table = columns_metadata_by_table
+        return True
+
+    def get_prefetched_columns_metadata(self, table_name: str) -> Optional[List[tuple]]:
+        """
+        Returns the prefetched (column_name, data_type, is_nullable) tuples or None if they were not prefetched
+        """
+        if self.columns_metadata_by_table is not None:
+            return self.columns_metadata_by_table.get(table_name.lower())
+
+    def get_table_names(self, limit: int = 10, filter: str = None) -> List[str]:
+        """
+        Returns the table names of the tables metadata query. The results are cached for
+        table_names_cache_ttl_seconds or until refresh_metadata() is called.
+        """
+        sql = self.dialect.sql_tables_metadata_query(limit=limit, filter=filter)
+        now = time.monotonic()
+        cached = self.table_names_by_sql.get(sql)
+        if cached is not None and now - cached[0] < self.table_names_cache_ttl_seconds:
+            return cached[1]
+        table_names = [row[0] for row in self.sql_fetchall(sql)]
+        self.table_names_by_sql[sql] = (now, table_names)
+        return table_names
+
+    def refresh_metadata(self):
+        self.columns_metadata_by_table = None
+        self.table_names_by_sql.clear()
+
     def create_scan(self, *args, **kwargs):
         return self.dialect.create_scan(self, *args, **kwargs)
 
     def close(self):
         if self.connection:
             try:
-                self.connection.close()
+                self.dialect.close_connection(self.connection)
             except Exception as e:
                 logging.debug(f'Closing connection failed: {str(e)}')
 
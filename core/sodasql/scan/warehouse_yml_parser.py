@@ -27,7 +27,7 @@ SODA_KEY_PROTOCOL = 'protocol'
 SODA_KEY_API_KEY_ID = 'api_key_id'
 SODA_KEY_API_KEY_SECRET = 'api_key_secret'
 
-VALID_WAREHOUSE_KEYS = [KEY_NAME, KEY_CONNECTION, KEY_SODA_ACCOUNT]
+VALID_WAREHOUSE_KEYS = frozenset([KEY_NAME, KEY_CONNECTION, KEY_SODA_ACCOUNT])
 
 
 def read_warehouse_yml_file(warehouse_yml_file: str):
@@ -39,6 +39,8 @@ class SodaServerClient:
         self.api_key_id: Optional[str] = api_key_id
         self.api_key_secret: Optional[str] = api_key_secret
         self.token: Optional[str] = token
+        # Reuses the connection to Soda Cloud across requests instead of redoing the TLS handshake for each request
+        self.session = requests.Session()
 
     def scan_start(self, warehouse, scan_yml: ScanYml, scan_time):
         soda_column_cfgs = {}
@@ -126,7 +128,7 @@ class SodaServerClient:
         return upload_response_json['fileId']
 
     def _upload_file(self, headers, temp_file):
-        upload_response = requests.post(
+        upload_response = self.session.post(
             f'{self.api_url}/scan/upload',
             headers=headers,
             data=temp_file)
@@ -176,7 +178,7 @@ class SodaServerClient:
         # logging.debug(f'> /api/{request_type} {json.dumps(request_body, indent=2)}')
         request_body['token'] = self.get_token()
         request_body['sodaSqlVersion'] = SODA_SQL_VERSION
-        response = requests.post(f'{self.api_url}/{request_type}', json=request_body)
+        response = self.session.post(f'{self.api_url}/{request_type}', json=request_body)
         response_json = response.json()
         # logging.debug(f'< {response.status_code} {json.dumps(response_json, indent=2)}')
         if response.status_code == 401 and not is_retry:
@@ -203,7 +205,7 @@ class SodaServerClient:
             else:
                 raise RuntimeError('No authentication in environment variables')
 
-            login_response = requests.post(f'{self.api_url}/command', json=login_command)
+            login_response = self.session.post(f'{self.api_url}/command', json=login_command)
 
             if login_response.status_code != 200:
                 raise AssertionError(f'< {login_response.status_code} Login failed: {login_response.content}')
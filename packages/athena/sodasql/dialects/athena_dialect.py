@@ -73,17 +73,15 @@ class AthenaDialect(Dialect):
         return conn
 
     def is_text(self, column_type: str):
-        column_type_upper = column_type.upper()
-        return (column_type_upper in ['CHAR', 'VARCHAR', 'STRING']
-                or re.match(r'^VARCHAR\([0-9]+\)$', column_type_upper))
+        return (column_type in ['CHAR', 'VARCHAR', 'STRING']
+                or re.match(r'^VARCHAR\([0-9]+\)$', column_type))
 
     def is_number(self, column_type: str):
-        column_type_upper = column_type.upper()
-        return (column_type_upper in ['TINYINT', 'SMALLINT', 'INT', 'INTEGER', 'BIGINT', 'DOUBLE', 'FLOAT', 'DECIMAL']
-                or re.match(r'^DECIMAL\([0-9]+(,[0-9]+)?\)$', column_type_upper))
+        return (column_type in ['TINYINT', 'SMALLINT', 'INT', 'INTEGER', 'BIGINT', 'DOUBLE', 'FLOAT', 'DECIMAL']
+                or re.match(r'^DECIMAL\([0-9]+(,[0-9]+)?\)$', column_type))
 
     def is_time(self, column_type: str):
-        return column_type.upper() in ['DATE', 'TIMESTAMP']
+        return column_type in ['DATE', 'TIMESTAMP']
 
     def sql_tables_metadata_query(self, limit: str = 10, filter: str = None):
         # Alternative ( https://github.com/sodadata/soda-sql/pull/98/files )
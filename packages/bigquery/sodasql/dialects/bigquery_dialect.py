@@ -70,13 +70,13 @@ class BigQueryDialect(Dialect):
                 f"WHERE table_name = '{table_name}';")
 
     def is_text(self, column_type: str):
-        return column_type.upper() in ['STRING']
+        return column_type in ['STRING']
 
     def is_number(self, column_type: str):
-        return column_type.upper() in ['INT64', 'NUMERIC', 'DECIMAL', 'BIGNUMERIC', 'BIGDECIMAL', 'FLOAT64']
+        return column_type in ['INT64', 'NUMERIC', 'DECIMAL', 'BIGNUMERIC', 'BIGDECIMAL', 'FLOAT64']
 
     def is_time(self, column_type: str):
-        return column_type.upper() in ['DATE', 'DATETIME', 'TIME', 'TIMESTAMP']
+        return column_type in ['DATE', 'DATETIME', 'TIME', 'TIMESTAMP']
 
     def qualify_table_name(self, table_name: str) -> str:
         return f'`{self.dataset_name}.{table_name}`'
@@ -78,10 +78,10 @@ class HiveDialect(Dialect):
         return ''
 
     def is_text(self, column_type: str):
-        return column_type.upper() in ['CHAR', 'VARCHAR']
+        return column_type in ['CHAR', 'VARCHAR']
 
     def is_number(self, column_type: str):
-        return column_type.upper() in [
+        return column_type in [
             'TINYINT', 'SMALLINT', 'INT', 'BIGINT',
             'FLOAT', 'DOUBLE', 'DOUBLE PRECISION', 'DECIMAL', 'NUMERIC']
 
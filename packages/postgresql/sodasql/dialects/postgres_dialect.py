@@ -9,6 +9,7 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 import re
+from typing import List, Optional
 
 import psycopg2
 
@@ -75,15 +76,31 @@ class PostgresDialect(Dialect):
             sql += f" \n  AND table_schema = '{self.schema}'"
         return sql
 
+    def connection_key(self) -> Optional[tuple]:
+        return (self.host, self.port, self.username, self.database, self.schema)
+
+    def sql_all_columns_metadata_query(self, table_names: Optional[List[str]] = None) -> Optional[str]:
+        # Without a schema, tables with the same name in different schemas can't be told apart
+        if not self.schema:
+            return None
+        sql = (f"SELECT table_name, column_name, data_type, is_nullable \n"
+               f"FROM information_schema.columns \n"
+               f"WHERE table_schema = '{self.schema}'")
+        if self.database:
+            sql += f" \n  AND table_catalog = '{self.database}'"
+        sql += self.sql_table_names_condition(table_names)
+        sql += " \nORDER BY table_name, ordinal_position"
+        return sql
+
     def is_text(self, column_type: str):
-        return column_type.upper() in ['CHARACTER VARYING', 'CHARACTER', 'CHAR', 'TEXT']
+        return column_type in ['CHARACTER VARYING', 'CHARACTER', 'CHAR', 'TEXT']
 
     def is_number(self, column_type: str):
-        return column_type.upper() in ['SMALLINT', 'INTEGER', 'BIGINT', 'DECIMAL', 'NUMERIC',
+        return column_type in ['SMALLINT', 'INTEGER', 'BIGINT', 'DECIMAL', 'NUMERIC',
                                        'REAL', 'DOUBLE PRECISION', 'SMALLSERIAL', 'SERIAL', 'BIGSERIAL']
 
     def is_time(self, column_type: str):
-        return column_type.upper() in [
+        return column_type in [
             'TIMESTAMP', 'DATE', 'TIME',
             'TIMESTAMP WITH TIME ZONE', 'TIMESTAMP WITHOUT TIME ZONE',
             'TIME WITH TIME ZONE', 'TIME WITHOUT TIME ZONE']
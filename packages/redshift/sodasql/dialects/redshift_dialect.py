@@ -117,13 +117,13 @@ class RedshiftDialect(PostgresDialect):
         return cluster_creds['DbUser'], cluster_creds['DbPassword']
 
     def is_text(self, column_type: str):
-        return column_type.upper() in ['CHARACTER VARYING', 'CHARACTER', 'CHAR', 'TEXT', 'NCHAR', 'NVARCHAR', 'BPCHAR']
+        return column_type in ['CHARACTER VARYING', 'CHARACTER', 'CHAR', 'TEXT', 'NCHAR', 'NVARCHAR', 'BPCHAR']
 
     def is_number(self, column_type: str):
-        return column_type.upper() in ['SMALLINT', 'INT2', 'INTEGER', 'INT', 'INT4', 'BIGINT', 'INT8']
+        return column_type in ['SMALLINT', 'INT2', 'INTEGER', 'INT', 'INT4', 'BIGINT', 'INT8']
 
     def is_time(self, column_type: str):
-        return column_type.upper() in ['DATE', 'TIME', 'TIMETZ', 'TIMESTAMP', 'TIMESTAMPTZ']
+        return column_type in ['DATE', 'TIME', 'TIMETZ', 'TIMESTAMP', 'TIMESTAMPTZ']
 
     def qualify_regex(self, regex):
         return self.escape_metacharacters(regex)
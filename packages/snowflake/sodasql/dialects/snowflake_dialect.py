@@ -8,14 +8,135 @@
 #  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
+import atexit
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
 
 from snowflake import connector
 from snowflake.connector import errorcode
+from snowflake.connector.errors import OperationalError, ProgrammingError
 from snowflake.connector.network import DEFAULT_SOCKET_CONNECT_TIMEOUT
 
 from sodasql.scan.dialect import Dialect, SNOWFLAKE, KEY_WAREHOUSE_TYPE, KEY_CONNECTION_TIMEOUT
 from sodasql.scan.parser import Parser
 
+ASYNC_QUERY_POLL_INTERVAL_SECONDS = 0.5
+
+# Results are decoded from Arrow by the connector's native iterator instead of being parsed as JSON,
+# even if the account or user defaults to the JSON result format.
+# Smaller result chunks (in MB, default 160) let the prefetch threads download large results in parallel.
+SESSION_PARAMETERS = {
+    'PYTHON_CONNECTOR_QUERY_RESULT_FORMAT': 'ARROW',
+    'CLIENT_RESULT_CHUNK_SIZE': 64
+}
+
+TEXT_TYPES = frozenset(['VARCHAR', 'CHAR', 'CHARACTER', 'STRING', 'TEXT'])
+NUMBER_TYPES = frozenset(['NUMBER', 'INT', 'INTEGER', 'BIGINT', 'SMALLINT', 'TINYINT', 'BYTEINT',
+                          'FLOAT', 'FLOAT4', 'FLOAT8',
+                          'DOUBLE', 'DOUBLE PRECISION', 'REAL'])
+TIME_TYPES = frozenset(['DATE', 'DATETIME', 'TIME', 'TIMESTAMP',
+                        'TIMESTAMP_LTZ', 'TIMESTAMP_NTZ', 'TIMESTAMP_TZ'])
+
+# unfortunately ER_FAILED_TO_CONNECT_TO_DB can't be used since it is mostly coming when auth is wrong
+CONNECTION_ERROR_CODES = frozenset([errorcode.ER_CONNECTION_IS_CLOSED,
+                                    errorcode.ER_FAILED_TO_REQUEST,
+                                    errorcode.ER_FAILED_TO_SERVER,
+                                    errorcode.ER_IDP_CONNECTION_ERROR,
+                                    errorcode.ER_INCORRECT_DESTINATION,
+                                    errorcode.ER_UNABLE_TO_OPEN_BROWSER,
+                                    errorcode.ER_UNABLE_TO_START_WEBSERVER,
+                                    errorcode.ER_INVALID_CERTIFICATE,
+                                    errorcode.ER_NO_ACCOUNT_NAME,
+                                    errorcode.ER_OLD_PYTHON,
+                                    errorcode.ER_NO_WINDOWS_SUPPORT,
+                                    errorcode.ER_FAILED_TO_GET_BOOTSTRAP,
+                                    errorcode.ER_NO_HOSTNAME_FOUND])
+AUTHENTICATION_ERROR_CODES = frozenset([errorcode.ER_FAILED_TO_CONNECT_TO_DB,
+                                        errorcode.ER_NO_USER,
+                                        errorcode.ER_NO_PASSWORD,
+                                        errorcode.ER_NOT_HTTPS_USED,
+                                        errorcode.ER_INVALID_VALUE,
+                                        errorcode.ER_INVALID_PRIVATE_KEY])
+
+
+class SnowflakeConnectionPool:
+    """
+    Keeps one live connection per connection key so that subsequent scans in the same process
+    don't have to redo the network, TLS and authentication handshake (or the browser round trip
+    for SSO authenticators)
+    """
+
+    def __init__(self):
+        self.connections: Dict[tuple, object] = {}
+        # Connecting can take a full login or a browser round trip, so only callers that need the
+        # connection of the same key wait for each other. self.lock only guards the dicts.
+        self.key_locks: Dict[tuple, threading.Lock] = {}
+        self.lock = threading.Lock()
+
+    def get_or_create(self, key: tuple, factory: Callable):
+        with self._get_key_lock(key):
+            with self.lock:
+                connection = self.connections.get(key)
+            if connection is not None:
+                if self._is_alive(connection):
+                    return connection
+                logging.debug('Pooled Snowflake connection is stale, reconnecting')
+                self._close(connection)
+                with self.lock:
+                    self.connections.pop(key, None)
+            connection = factory()
+            with self.lock:
+                self.connections[key] = connection
+            return connection
+
+    def contains(self, connection) -> bool:
+        with self.lock:
+            return any(connection is pooled_connection for pooled_connection in self.connections.values())
+
+    def close_all(self):
+        with self.lock:
+            connections = list(self.connections.values())
+            self.connections.clear()
+        for connection in connections:
+            self._close(connection)
+
+    def _get_key_lock(self, key: tuple) -> threading.Lock:
+        with self.lock:
+            key_lock = self.key_locks.get(key)
+            if key_lock is None:
+                key_lock = threading.Lock()
+                self.key_locks[key] = key_lock
+            return key_lock
+
+    @staticmethod
+    def _is_alive(connection) -> bool:
+        if connection.is_closed():
+            return False
+        try:
+            cursor = connection.cursor()
+            try:
+                cursor.execute('SELECT 1')
+            finally:
+                cursor.close()
+            return True
+        except (ProgrammingError, OperationalError) as e:
+            logging.debug(f'Pooled Snowflake connection check failed: {str(e)}')
+            return False
+
+    @staticmethod
+    def _close(connection):
+        try:
+            connection.close()
+        except Exception as e:
+            logging.debug(f'Closing connection failed: {str(e)}')
+
+
+CONNECTION_POOL = SnowflakeConnectionPool()
+atexit.register(CONNECTION_POOL.close_all)
+
 
 class SnowflakeDialect(Dialect):
 
@@ -31,10 +152,11 @@ class SnowflakeDialect(Dialect):
             self.role = parser.get_str_optional('role')
             self.passcode_in_password = parser.get_bool_optional('passcode_in_password', False)
             self.private_key = parser.get_str_optional('private_key')
-            self.client_prefetch_threads = parser.get_int_optional('client_prefetch_threads', 4)
+            self.client_prefetch_threads = parser.get_int_optional('client_prefetch_threads', 8)
             self.client_session_keep_alive = parser.get_bool_optional('client_session_keep_alive', False)
             self.authenticator = parser.get_str_optional('authenticator', 'snowflake')
             self.connection_timeout = parser.get_int_optional(KEY_CONNECTION_TIMEOUT, DEFAULT_SOCKET_CONNECT_TIMEOUT)
+            self.connection_pooling = parser.get_bool_optional('connection_pooling', True)
 
     def default_connection_properties(self, params: dict):
         return {
@@ -55,37 +177,94 @@ class SnowflakeDialect(Dialect):
 
     def create_connection(self):
         try:
-            conn = connector.connect(
-                user=self.username,
-                password=self.password,
-                account=self.account,
-                warehouse=self.warehouse,
-                database=self.database,
-                schema=self.schema,
-                login_timeout=self.connection_timeout,
-                role=self.role,
-                passcode_in_password=self.passcode_in_password,
-                private_key=self.private_key,
-                client_prefetch_threads=self.client_prefetch_threads,
-                client_session_keep_alive=self.client_session_keep_alive,
-                authenticator=self.authenticator,
-            )
-            return conn
+            if self.connection_pooling:
+                return CONNECTION_POOL.get_or_create(
+                    self.connection_key(),
+                    # The session of a pooled connection must outlive the scans in between
+                    lambda: self._connect(client_session_keep_alive=True))
+            return self._connect(client_session_keep_alive=self.client_session_keep_alive)
 
         except Exception as e:
             self.try_to_raise_soda_sql_exception(e)
 
+    def _connect(self, client_session_keep_alive: bool):
+        return connector.connect(
+            user=self.username,
+            password=self.password,
+            account=self.account,
+            warehouse=self.warehouse,
+            database=self.database,
+            schema=self.schema,
+            login_timeout=self.connection_timeout,
+            role=self.role,
+            passcode_in_password=self.passcode_in_password,
+            private_key=self.private_key,
+            client_prefetch_threads=self.client_prefetch_threads,
+            client_session_keep_alive=client_session_keep_alive,
+            authenticator=self.authenticator,
+            # the connector adds its own entries to the session parameters it is given
+            session_parameters=dict(SESSION_PARAMETERS),
+        )
+
+    def connection_key(self) -> tuple:
+        # Also keys the pooled connections
+        return (self.account, self.username, self.warehouse, self.database, self.schema, self.role,
+                self.authenticator)
+
+    def close_connection(self, connection):
+        # Pooled connections stay open for the next scan and are closed on exit
+        if not CONNECTION_POOL.contains(connection):
+            connection.close()
+
+    def sql_fetchall_multi(self, connection, sqls: List[str]) -> List[List[tuple]]:
+        if len(sqls) < 2:
+            return super().sql_fetchall_multi(connection, sqls)
+        # Submits all statements in a single request and reads the result of each statement with nextset(),
+        # multi statement execution through cursor.execute requires snowflake-connector-python 2.9.0
+        sql = ';\n'.join(sqls)
+        cursor = connection.cursor()
+        try:
+            logging.debug(f'Executing {len(sqls)} SQL queries: \n{sql}')
+            start = datetime.now()
+            cursor.execute(sql, num_statements=len(sqls))
+            results = [cursor.fetchall()]
+            while cursor.nextset():
+                results.append(cursor.fetchall())
+            delta = datetime.now() - start
+            logging.debug(f'SQL took {str(delta)}')
+            return results
+        finally:
+            cursor.close()
+
+    def sql_fetchone_async(self, connection, sql: str) -> Callable[[], tuple]:
+        cursor = connection.cursor()
+        try:
+            logging.debug(f'Submitting async SQL query: \n{sql}')
+            cursor.execute_async(sql)
+            query_id = cursor.sfqid
+        except Exception:
+            cursor.close()
+            raise
+
+        def fetchone():
+            try:
+                while connection.is_still_running(connection.get_query_status_throw_if_error(query_id)):
+                    time.sleep(ASYNC_QUERY_POLL_INTERVAL_SECONDS)
+                cursor.get_results_from_sfqid(query_id)
+                return cursor.fetchone()
+            finally:
+                cursor.close()
+
+        return fetchone
+
     def is_text(self, column_type: str):
-        return column_type.upper() in ['VARCHAR', 'CHAR', 'CHARACTER', 'STRING', 'TEXT']
+        return column_type in TEXT_TYPES
 
     def is_number(self, column_type: str):
-        return column_type.upper() in ['NUMBER', 'INT', 'INTEGER', 'BIGINT', 'SMALLINT', 'TINYINT', 'BYTEINT',
-                                       'FLOAT', 'FLOAT4', 'FLOAT8',
-                                       'DOUBLE', 'DOUBLE PRECISION', 'REAL']
+        return column_type in NUMBER_TYPES
 
     def is_time(self, column_type: str):
-        return column_type.upper() in ['DATE', 'DATETIME', 'TIME', 'TIMESTAMP',
-                                       'TIMESTAMP_LTZ', 'TIMESTAMP_NTZ', 'TIMESTAMP_TZ']
+        return column_type in TIME_TYPES
 
     def sql_tables_metadata_query(self, limit: str = 10, filter: str = None):
         sql = (f"SELECT table_name \n"
@@ -107,6 +286,16 @@ class SnowflakeDialect(Dialect):
             sql += f" \n  AND lower(table_schema) = '{self.schema.lower()}'"
         return sql
 
+    def sql_all_columns_metadata_query(self, table_names: Optional[List[str]] = None) -> str:
+        sql = (f"SELECT table_name, column_name, data_type, is_nullable \n"
+               f'FROM information_schema.columns \n'
+               f"WHERE lower(table_schema) = '{self.schema.lower()}'")
+        if self.database:
+            sql += f" \n  AND lower(table_catalog) = '{self.database.lower()}'"
+        sql += self.sql_table_names_condition(table_names)
+        sql += " \nORDER BY table_name, ordinal_position"
+        return sql
+
     def qualify_regex(self, regex) -> str:
         return self.escape_metacharacters(regex)
 
@@ -117,29 +306,7 @@ class SnowflakeDialect(Dialect):
         return f'"{table_name.upper()}"'
 
     def is_connection_error(self, exception):
-        if exception is None or exception.errno is None:
-            return False
-        # unfortunately ER_FAILED_TO_CONNECT_TO_DB can't be used since it is mostly coming when auth is wrong
-        return exception.errno == errorcode.ER_CONNECTION_IS_CLOSED or \
-               exception.errno == errorcode.ER_FAILED_TO_REQUEST or \
-               exception.errno == errorcode.ER_FAILED_TO_SERVER or \
-               exception.errno == errorcode.ER_IDP_CONNECTION_ERROR or \
-               exception.errno == errorcode.ER_INCORRECT_DESTINATION or \
-               exception.errno == errorcode.ER_UNABLE_TO_OPEN_BROWSER or \
-               exception.errno == errorcode.ER_UNABLE_TO_START_WEBSERVER or \
-               exception.errno == errorcode.ER_INVALID_CERTIFICATE or \
-               exception.errno == errorcode.ER_NO_ACCOUNT_NAME or \
-               exception.errno == errorcode.ER_OLD_PYTHON or \
-               exception.errno == errorcode.ER_NO_WINDOWS_SUPPORT or \
-               exception.errno == errorcode.ER_FAILED_TO_GET_BOOTSTRAP or \
-               exception.errno == errorcode.ER_NO_HOSTNAME_FOUND
+        return exception is not None and exception.errno in CONNECTION_ERROR_CODES
 
     def is_authentication_error(self, exception):
-        if exception is None or exception.errno is None:
-            return False
-        return exception.errno == errorcode.ER_FAILED_TO_CONNECT_TO_DB or \
-               exception.errno == errorcode.ER_NO_USER or \
-               exception.errno == errorcode.ER_NO_PASSWORD or \
-               exception.errno == errorcode.ER_NOT_HTTPS_USED or \
-               exception.errno == errorcode.ER_INVALID_VALUE or \
-               exception.errno == errorcode.ER_INVALID_PRIVATE_KEY
+        return exception is not None and exception.errno in AUTHENTICATION_ERROR_CODES
@@ -98,14 +98,14 @@ class SQLServerDialect(Dialect):
         return sql
 
     def is_text(self, column_type: str):
-        return column_type.upper() in ['VARCHAR', 'CHAR', 'TEXT', 'NVARCHAR', 'NCHAR', 'NTEXT']
+        return column_type in ['VARCHAR', 'CHAR', 'TEXT', 'NVARCHAR', 'NCHAR', 'NTEXT']
 
     def is_number(self, column_type: str):
-        return column_type.upper() in ['BIGINT', 'NUMERIC', 'BIT', 'SMALLINT', 'DECIMAL', 'SMALLMONEY',
+        return column_type in ['BIGINT', 'NUMERIC', 'BIT', 'SMALLINT', 'DECIMAL', 'SMALLMONEY',
                                        'INT', 'TINYINT', 'MONEY', 'FLOAT', 'REAL']
 
     def is_time(self, column_type: str):
-        return column_type.upper() in ['DATE', 'DATETIMEOFFSET', 'DATETIME2', 'SMALLDATETIME', 'DATETIME', 'TIME']
+        return column_type in ['DATE', 'DATETIMEOFFSET', 'DATETIME2', 'SMALLDATETIME', 'DATETIME', 'TIME']
 
     def qualify_table_name(self, table_name: str) -> str:
         if self.schema:
@@ -0,0 +1,42 @@
+#  Copyright 2020 Soda
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#   http://www.apache.org/licenses/LICENSE-2.0
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+from unittest import TestCase
+
+from sodasql.scan.dialect import KEY_WAREHOUSE_TYPE, POSTGRES
+from sodasql.scan.dialect_parser import DialectParser
+
+
+class TestDialectConnectionKey(TestCase):
+
+    @staticmethod
+    def create_postgres_dialect(**connection_properties):
+        warehouse_connection_dict = {
+            KEY_WAREHOUSE_TYPE: POSTGRES,
+            'host': 'localhost',
+            'username': 'sodasql',
+            'database': 'sodasql',
+            'schema': 'public'
+        }
+        warehouse_connection_dict.update(connection_properties)
+        dialect_parser = DialectParser(warehouse_connection_dict)
+        dialect_parser.assert_no_warnings_or_errors()
+        return dialect_parser.dialect
+
+    def test_same_configuration_same_connection_key(self):
+        self.assertEqual(self.create_postgres_dialect().connection_key(),
+                         self.create_postgres_dialect().connection_key())
+
+    def test_different_configurations_different_connection_keys(self):
+        connection_key = self.create_postgres_dialect().connection_key()
+
+        self.assertNotEqual(connection_key, self.create_postgres_dialect(host='otherhost').connection_key())
+        self.assertNotEqual(connection_key, self.create_postgres_dialect(port='5433').connection_key())
+        self.assertNotEqual(connection_key, self.create_postgres_dialect(schema='other').connection_key())
@@ -11,8 +11,10 @@
 
 from unittest import TestCase
 
+from sodasql.scan.metric import Metric
 from sodasql.scan.parser import ERROR, WARNING
-from sodasql.scan.scan_yml_parser import ScanYmlParser, KEY_METRICS, KEY_COLUMNS, KEY_TABLE_NAME
+from sodasql.scan.scan_yml_parser import ScanYmlParser, KEY_METRICS, KEY_METRIC_GROUPS, KEY_COLUMNS, KEY_TABLE_NAME, \
+    KEY_SQL_METRICS, SQL_METRIC_KEY_TYPE, SQL_METRIC_KEY_NAME, SQL_METRIC_KEY_SQL, SQL_METRIC_KEY_METRIC_NAMES
 
 
 class TestScanConfigurationValidation(TestCase):
@@ -65,3 +67,90 @@ class TestScanConfigurationValidation(TestCase):
         self.assertIn('Invalid', log.message)
         self.assertIn('valid_format', log.message)
         self.assertIn('buzz', log.message)
+
+    def test_metric_group_all(self):
+        parser = ScanYmlParser({
+            KEY_TABLE_NAME: 't',
+            KEY_METRIC_GROUPS: ['all']
+        }, 'Test scan')
+
+        self.assertEqual(set(Metric.METRIC_TYPES), parser.scan_yml.metrics)
+
+    def test_metric_group_validity_implies_missing_and_row_count(self):
+        parser = ScanYmlParser({
+            KEY_TABLE_NAME: 't',
+            KEY_METRIC_GROUPS: ['validity']
+        }, 'Test scan')
+
+        self.assertEqual({Metric.ROW_COUNT,
+                          Metric.MISSING_COUNT, Metric.MISSING_PERCENTAGE,
+                          Metric.VALUES_COUNT, Metric.VALUES_PERCENTAGE,
+                          Metric.INVALID_COUNT, Metric.INVALID_PERCENTAGE,
+                          Metric.VALID_COUNT, Metric.VALID_PERCENTAGE}, parser.scan_yml.metrics)
+
+    def test_metric_implies_its_metric_group(self):
+        parser = ScanYmlParser({
+            KEY_TABLE_NAME: 't',
+            KEY_METRICS: [Metric.VALID_COUNT]
+        }, 'Test scan')
+
+        self.assertIn(Metric.INVALID_PERCENTAGE, parser.scan_yml.metrics)
+        self.assertIn(Metric.MISSING_COUNT, parser.scan_yml.metrics)
+        self.assertIn(Metric.ROW_COUNT, parser.scan_yml.metrics)
+
+    def test_histogram_implies_min_and_max(self):
+        parser = ScanYmlParser({
+            KEY_TABLE_NAME: 't',
+            KEY_METRICS: [Metric.HISTOGRAM]
+        }, 'Test scan')
+
+        self.assertEqual({Metric.HISTOGRAM, Metric.MIN, Metric.MAX,
+                          Metric.FREQUENT_VALUES, Metric.MINS, Metric.MAXS}, parser.scan_yml.metrics)
+
+    def test_invalid_metric_group(self):
+        parser = ScanYmlParser({
+            KEY_TABLE_NAME: 't',
+            KEY_METRIC_GROUPS: ['buzz']
+        }, 'Test scan')
+
+        log = parser.logs[0]
+        self.assertIn(WARNING, log.level)
+        self.assertIn('Invalid metric_group', log.message)
+        self.assertIn('buzz', log.message)
+        self.assertEqual(set(), parser.scan_yml.metrics)
+
+    def test_resolved_metrics_are_not_shared(self):
+        scan_yml_dict = {
+            KEY_TABLE_NAME: 't',
+            KEY_METRIC_GROUPS: ['length']
+        }
+        metrics = ScanYmlParser(scan_yml_dict, 'Test scan').scan_yml.metrics
+        metrics.add(Metric.ROW_COUNT)
+        metrics.discard(Metric.MIN_LENGTH)
+
+        self.assertEqual({Metric.AVG_LENGTH, Metric.MAX_LENGTH, Metric.MIN_LENGTH},
+                         ScanYmlParser(scan_yml_dict, 'Test scan').scan_yml.metrics)
+
+    def test_sql_metric_parse_methods_can_be_overridden(self):
+        parsed_types = []
+
+        class RecordingScanYmlParser(ScanYmlParser):
+            def parse_sql_metric_failed_rows(self, sql_metric_type, sql_metric_index, column_name, sql_metric_dict=None):
+                parsed_types.append(sql_metric_type)
+                return super().parse_sql_metric_failed_rows(sql_metric_type, sql_metric_index, column_name)
+
+        parser = RecordingScanYmlParser({
+            KEY_TABLE_NAME: 't',
+            KEY_SQL_METRICS: [{
+                SQL_METRIC_KEY_TYPE: 'failed_rows',
+                SQL_METRIC_KEY_NAME: 'negative_sizes',
+                SQL_METRIC_KEY_SQL: 'SELECT * FROM t WHERE size < 0'
+            }, {
+                SQL_METRIC_KEY_SQL: 'SELECT COUNT(*) AS total FROM t',
+                SQL_METRIC_KEY_METRIC_NAMES: ['total']
+            }]
+        }, 'Test scan')
+
+        self.assertEqual(['failed_rows'], parsed_types)
+        self.assertEqual(['failed_rows', 'numeric'],
+                         [sql_metric_yml.type for sql_metric_yml in parser.scan_yml.sql_metric_ymls])
@@ -0,0 +1,63 @@
+#  Copyright 2020 Soda
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#   http://www.apache.org/licenses/LICENSE-2.0
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+import os
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import patch
+
+from sodasql.scan.file_system import FileSystemSingleton
+from sodasql.scan.scan_yml_parser import ScanYmlParser, KEY_TABLE_NAME, KEY_SQL_METRICS, \
+    SQL_METRIC_KEY_SQL_FILE, SQL_METRIC_KEY_METRIC_NAMES
+
+
+class TestScanYmlSqlFile(TestCase):
+
+    def setUp(self) -> None:
+        self.temporary_directory = TemporaryDirectory()
+        self.scan_yml_path = os.path.join(self.temporary_directory.name, 'scan.yml')
+        self.sql_file_path = os.path.join(self.temporary_directory.name, 'metric.sql')
+
+    def tearDown(self) -> None:
+        self.temporary_directory.cleanup()
+
+    def write_sql_file(self, sql: str, modification_time: float):
+        with open(self.sql_file_path, 'w') as f:
+            f.write(sql)
+        os.utime(self.sql_file_path, (modification_time, modification_time))
+
+    def parse_sql(self):
+        parser = ScanYmlParser({
+            KEY_TABLE_NAME: 't',
+            KEY_SQL_METRICS: [{
+                SQL_METRIC_KEY_SQL_FILE: 'metric.sql',
+                SQL_METRIC_KEY_METRIC_NAMES: ['total']
+            }]
+        }, self.scan_yml_path)
+        return parser.scan_yml.sql_metric_ymls[0].sql
+
+    def test_sql_file_read_again_after_modification(self):
+        self.write_sql_file('SELECT 1 AS total', 1000000)
+        self.assertEqual('SELECT 1 AS total', self.parse_sql())
+
+        self.write_sql_file('SELECT 2 AS total', 1000000)
+        # Same modification time, so the cached contents are used
+        self.assertEqual('SELECT 1 AS total', self.parse_sql())
+
+        self.write_sql_file('SELECT 2 AS total', 2000000)
+        self.assertEqual('SELECT 2 AS total', self.parse_sql())
+
+    def test_sql_file_read_failure_not_cached(self):
+        self.write_sql_file('SELECT 3 AS total', 3000000)
+
+        with patch.object(FileSystemSingleton.INSTANCE, 'file_read_as_str', return_value=None):
+            self.assertIsNone(self.parse_sql())
+
+        self.assertEqual('SELECT 3 AS total', self.parse_sql())
@@ -0,0 +1,172 @@
+#  Copyright 2020 Soda
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#   http://www.apache.org/licenses/LICENSE-2.0
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+import threading
+from unittest import TestCase
+from unittest.mock import patch
+
+from snowflake.connector.errors import ProgrammingError
+
+from sodasql.dialects.snowflake_dialect import CONNECTION_POOL, SESSION_PARAMETERS, SnowflakeConnectionPool, \
+    SnowflakeDialect
+from sodasql.scan.dialect import KEY_WAREHOUSE_TYPE, SNOWFLAKE
+from sodasql.scan.dialect_parser import DialectParser
+
+
+class FakeCursor:
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def execute(self, sql):
+        if self.connection.check_fails:
+            raise ProgrammingError('Session no longer exists')
+        self.connection.executed_sqls.append(sql)
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+
+    def __init__(self):
+        self.closed = False
+        self.check_fails = False
+        self.executed_sqls = []
+
+    def is_closed(self):
+        return self.closed
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def close(self):
+        self.closed = True
+
+
+class TestSnowflakeConnectionPool(TestCase):
+
+    def setUp(self) -> None:
+        self.pool = SnowflakeConnectionPool()
+        self.created_connections = []
+
+    def create_connection(self):
+        connection = FakeConnection()
+        self.created_connections.append(connection)
+        return connection
+
+    def test_connection_reused(self):
+        connection = self.pool.get_or_create(('a',), self.create_connection)
+
+        self.assertIs(connection, self.pool.get_or_create(('a',), self.create_connection))
+        self.assertEqual(1, len(self.created_connections))
+        self.assertEqual(['SELECT 1'], connection.executed_sqls)
+
+    def test_connection_per_key(self):
+        connection_a = self.pool.get_or_create(('a',), self.create_connection)
+        connection_b = self.pool.get_or_create(('b',), self.create_connection)
+
+        self.assertIsNot(connection_a, connection_b)
+
+    def test_closed_connection_evicted(self):
+        stale_connection = self.pool.get_or_create(('a',), self.create_connection)
+        stale_connection.closed = True
+
+        connection = self.pool.get_or_create(('a',), self.create_connection)
+
+        self.assertIsNot(stale_connection, connection)
+        self.assertFalse(self.pool.contains(stale_connection))
+        self.assertTrue(self.pool.contains(connection))
+
+    def test_failing_connection_check_evicted(self):
+        stale_connection = self.pool.get_or_create(('a',), self.create_connection)
+        stale_connection.check_fails = True
+
+        connection = self.pool.get_or_create(('a',), self.create_connection)
+
+        self.assertIsNot(stale_connection, connection)
+        self.assertTrue(stale_connection.closed)
+        self.assertEqual(2, len(self.created_connections))
+
+    def test_close_all(self):
+        connection_a = self.pool.get_or_create(('a',), self.create_connection)
+        connection_b = self.pool.get_or_create(('b',), self.create_connection)
+
+        self.pool.close_all()
+
+        self.assertTrue(connection_a.closed)
+        self.assertTrue(connection_b.closed)
+        self.assertFalse(self.pool.contains(connection_a))
+        self.assertIsNot(connection_a, self.pool.get_or_create(('a',), self.create_connection))
+
+    def test_connecting_does_not_block_other_keys(self):
+        connecting = threading.Event()
+        release = threading.Event()
+
+        def create_slow_connection():
+            connecting.set()
+            release.wait(5)
+            return self.create_connection()
+
+        slow_thread = threading.Thread(target=self.pool.get_or_create, args=(('slow',), create_slow_connection))
+        slow_thread.start()
+        try:
+            self.assertTrue(connecting.wait(5))
+            connection_done = threading.Event()
+
+            def create_other_connection():
+                self.pool.get_or_create(('other',), self.create_connection)
+                connection_done.set()
+
+            threading.Thread(target=create_other_connection).start()
+            self.assertTrue(connection_done.wait(5))
+        finally:
+            release.set()
+            slow_thread.join()
+
+    def test_close_connection_keeps_pooled_connection_open(self):
+        dialect = SnowflakeDialect(None)
+        pooled_connection = CONNECTION_POOL.get_or_create(('test_close_connection',), self.create_connection)
+        try:
+            dialect.close_connection(pooled_connection)
+            self.assertFalse(pooled_connection.closed)
+
+            unpooled_connection = FakeConnection()
+            dialect.close_connection(unpooled_connection)
+            self.assertTrue(unpooled_connection.closed)
+        finally:
+            CONNECTION_POOL.close_all()
+        self.assertTrue(pooled_connection.closed)
+
+    def test_connect_does_not_share_session_parameters(self):
+        expected_session_parameters = dict(SESSION_PARAMETERS)
+        dialect = SnowflakeDialect(DialectParser(warehouse_connection_dict={
+            KEY_WAREHOUSE_TYPE: SNOWFLAKE,
+            'account': 'account',
+            'warehouse': 'warehouse',
+            'username': 'username',
+            'password': 'password',
+            'schema': 'PUBLIC',
+            'connection_pooling': False
+        }))
+        session_parameters_by_call = []
+
+        def connect(session_parameters, **kwargs):
+            # mutates the given dict like the connector does
+            session_parameters['CLIENT_SESSION_KEEP_ALIVE'] = kwargs['client_session_keep_alive']
+            session_parameters_by_call.append(session_parameters)
+            return self.create_connection()
+
+        with patch('sodasql.dialects.snowflake_dialect.connector.connect', side_effect=connect):
+            dialect.create_connection()
+            dialect.create_connection()
+
+        self.assertEqual(expected_session_parameters, SESSION_PARAMETERS)
+        self.assertIsNot(session_parameters_by_call[0], session_parameters_by_call[1])
@@ -0,0 +1,119 @@
+#  Copyright 2020 Soda
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#   http://www.apache.org/licenses/LICENSE-2.0
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+from unittest.mock import patch
+
+from sodasql.scan.metric import Metric
+from sodasql.scan.scan import _AGGREGATION_QUERY_CACHE
+from sodasql.scan.scan_yml_parser import ScanYmlParser, KEY_METRICS, KEY_TABLE_NAME, KEY_FILTER, KEY_COLUMNS, \
+    COLUMN_KEY_VALID_MIN
+from tests.common.sql_test_case import SqlTestCase
+
+
+class TestAggregationQueryCache(SqlTestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.sql_recreate_table(
+            [f"name {self.dialect.data_type_varchar_255}",
+             f"size {self.dialect.data_type_integer}"],
+            ["('one', 1)",
+             "('two', 2)",
+             "('three', 3)"])
+
+    def parse_scan_yml(self, scan_yml_dict: dict):
+        scan_yml_dict[KEY_TABLE_NAME] = self.default_test_table_name
+        scan_yml_dict[KEY_METRICS] = [Metric.ROW_COUNT, Metric.MIN, Metric.MAX, Metric.AVG_LENGTH]
+        scan_yml_parser = ScanYmlParser(scan_yml_dict, 'test-scan')
+        scan_yml_parser.assert_no_warnings_or_errors()
+        return scan_yml_parser.scan_yml
+
+    def create_scan(self, scan_yml, variables: dict = None):
+        scan = self.warehouse.create_scan(scan_yml=scan_yml, variables=variables)
+        scan.close_warehouse = False
+        return scan
+
+    def test_cached_aggregation_query_reused_with_new_measurements(self):
+        scan_yml = self.parse_scan_yml({})
+        scan_result = self.create_scan(scan_yml).execute()
+        cached_aggregation_query = next(iter(_AGGREGATION_QUERY_CACHE[scan_yml].values()))
+
+        scan = self.create_scan(scan_yml)
+        with patch.object(scan, '_build_aggregation_query') as build_aggregation_query:
+            repeated_scan_result = scan.execute()
+        build_aggregation_query.assert_not_called()
+
+        self.assertEqual([cached_aggregation_query], list(_AGGREGATION_QUERY_CACHE[scan_yml].values()))
+        self.assertEqual([str(measurement) for measurement in scan_result.measurements],
+                         [str(measurement) for measurement in repeated_scan_result.measurements])
+        self.assertEqual(3, repeated_scan_result.get(Metric.ROW_COUNT))
+        for measurement in repeated_scan_result.measurements:
+            self.assertTrue(all(measurement is not other_measurement
+                                for other_measurement in scan_result.measurements))
+            self.assertTrue(all(measurement is not cached_measurement
+                                for cached_measurement in cached_aggregation_query.measurements))
+        self.assertTrue(all(cached_measurement.value is None
+                            for cached_measurement in cached_aggregation_query.measurements))
+
+    def test_different_filter_misses_cache(self):
+        scan_yml = self.parse_scan_yml({KEY_FILTER: 'size >= {{ min_size }}'})
+
+        scan_result = self.create_scan(scan_yml, {'min_size': 1}).execute()
+        filtered_scan_result = self.create_scan(scan_yml, {'min_size': 3}).execute()
+
+        self.assertEqual(2, len(_AGGREGATION_QUERY_CACHE[scan_yml]))
+        self.assertEqual(3, scan_result.get(Metric.ROW_COUNT))
+        self.assertEqual(1, filtered_scan_result.get(Metric.ROW_COUNT))
+
+    def test_different_columns_miss_cache(self):
+        scan_yml = self.parse_scan_yml({})
+        self.create_scan(scan_yml).execute()
+
+        self.sql_recreate_table(
+            [f"name {self.dialect.data_type_varchar_255}",
+             f"size {self.dialect.data_type_integer}",
+             f"weight {self.dialect.data_type_integer}"],
+            ["('one', 1, 10)"])
+        scan_result = self.create_scan(scan_yml).execute()
+
+        self.assertEqual(2, len(_AGGREGATION_QUERY_CACHE[scan_yml]))
+        self.assertEqual(10, scan_result.get(Metric.MAX, 'weight'))
+
+    def test_changed_metrics_miss_cache(self):
+        scan_yml = self.parse_scan_yml({})
+        self.create_scan(scan_yml).execute()
+
+        scan_yml.metrics.add(Metric.MISSING_COUNT)
+        scan_result = self.create_scan(scan_yml).execute()
+
+        self.assertEqual(2, len(_AGGREGATION_QUERY_CACHE[scan_yml]))
+        self.assertEqual(0, scan_result.get(Metric.MISSING_COUNT, 'size'))
+
+    def test_changed_column_configuration_misses_cache(self):
+        scan_yml = self.parse_scan_yml({KEY_COLUMNS: {'size': {COLUMN_KEY_VALID_MIN: 2}}})
+        scan_result = self.create_scan(scan_yml).execute()
+
+        scan_yml.columns['size'].validity.min = 3
+        changed_scan_result = self.create_scan(scan_yml).execute()
+
+        self.assertEqual(2, len(_AGGREGATION_QUERY_CACHE[scan_yml]))
+        self.assertEqual(2, scan_result.get(Metric.MIN, 'size'))
+        self.assertEqual(3, changed_scan_result.get(Metric.MIN, 'size'))
+
+    def test_oldest_aggregation_query_evicted(self):
+        scan_yml = self.parse_scan_yml({KEY_FILTER: 'size >= {{ min_size }}'})
+
+        with patch('sodasql.scan.scan.AGGREGATION_QUERY_CACHE_SIZE', 2):
+            for min_size in [1, 2, 3]:
+                self.create_scan(scan_yml, {'min_size': min_size}).execute()
+
+        # The filter sql is part of the cache key
+        self.assertEqual(['size >= 2', 'size >= 3'],
+                         [cache_key[3] for cache_key in _AGGREGATION_QUERY_CACHE[scan_yml]])
@@ -0,0 +1,88 @@
+#  Copyright 2020 Soda
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#   http://www.apache.org/licenses/LICENSE-2.0
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+from unittest.mock import call, patch
+
+from sodasql.dataset_analyzer import DatasetAnalyzer
+from sodasql.scan.metric import Metric
+from sodasql.scan.scan_yml_parser import KEY_METRICS
+from tests.common.sql_test_case import SqlTestCase
+
+
+class TestPrefetchColumnsMetadata(SqlTestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.other_table_name = f'{self.default_test_table_name}_other'
+        self.sql_recreate_table(
+            [f"name {self.dialect.data_type_varchar_255}",
+             f"size {self.dialect.data_type_integer}"],
+            ["('one', 1)",
+             "('two', 2)"])
+        self.sql_recreate_table(
+            [f"id {self.dialect.data_type_integer}"],
+            ["(1)"],
+            table_name=self.other_table_name)
+
+    def tearDown(self) -> None:
+        self.warehouse.refresh_metadata()
+        super().tearDown()
+
+    def get_schema(self, scan_result):
+        return next(measurement.value for measurement in scan_result.measurements
+                    if measurement.metric == Metric.SCHEMA)
+
+    def test_prefetched_columns_metadata_used_by_scans(self):
+        if not self.dialect.sql_all_columns_metadata_query():
+            self.skipTest(f'{self.target} does not support prefetching the column metadata')
+
+        scan_yml_dict = {KEY_METRICS: [Metric.ROW_COUNT]}
+        queried_schema = self.get_schema(self.scan(scan_yml_dict))
+
+        self.assertTrue(self.warehouse.prefetch_columns_metadata())
+        self.assertEqual(['name', 'size'],
+                         [column_tuple[0].lower() for column_tuple in
+                          self.warehouse.get_prefetched_columns_metadata(self.default_test_table_name)])
+        self.assertEqual(['id'],
+                         [column_tuple[0].lower() for column_tuple in
+                          self.warehouse.get_prefetched_columns_metadata(self.other_table_name)])
+
+        columns_metadata_sql = self.dialect.sql_columns_metadata_query(self.default_test_table_name)
+        with patch.object(self.warehouse, 'sql_fetchall', wraps=self.warehouse.sql_fetchall) as sql_fetchall:
+            scan_result = self.scan(scan_yml_dict)
+        self.assertNotIn(call(columns_metadata_sql), sql_fetchall.call_args_list)
+        self.assertEqual(queried_schema, self.get_schema(scan_result))
+        self.assertEqual(2, scan_result.get(Metric.ROW_COUNT))
+
+    def test_prefetched_columns_metadata_used_by_analyze(self):
+        if not self.dialect.sql_all_columns_metadata_query():
+            self.skipTest(f'{self.target} does not support prefetching the column metadata')
+
+        queried_results = DatasetAnalyzer().analyze(self.warehouse, self.default_test_table_name)
+
+        self.warehouse.prefetch_columns_metadata()
+        prefetched_results = DatasetAnalyzer().analyze(self.warehouse, self.default_test_table_name)
+
+        self.assertEqual(queried_results, prefetched_results)
+
+    def test_refresh_metadata_drops_prefetched_columns_metadata(self):
+        self.warehouse.prefetch_columns_metadata()
+        self.warehouse.refresh_metadata()
+
+        self.assertIsNone(self.warehouse.get_prefetched_columns_metadata(self.default_test_table_name))
+
+    def test_prefetch_columns_metadata_of_given_tables(self):
+        if not self.dialect.sql_all_columns_metadata_query():
+            self.skipTest(f'{self.target} does not support prefetching the column metadata')
+
+        self.assertTrue(self.warehouse.prefetch_columns_metadata([self.other_table_name.upper()]))
+
+        self.assertEqual([self.other_table_name], list(self.warehouse.columns_metadata_by_table))
+        self.assertIsNone(self.warehouse.get_prefetched_columns_metadata(self.default_test_table_name))
@@ -0,0 +1,143 @@
+#  Copyright 2020 Soda
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#   http://www.apache.org/licenses/LICENSE-2.0
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+import copy
+from unittest.mock import patch
+
+from sodasql.scan.metric import Metric
+from sodasql.scan.scan_batch import ScanBatch
+from sodasql.scan.scan_builder import ScanBuilder
+from sodasql.scan.scan_yml_parser import ScanYmlParser, KEY_METRICS, KEY_TABLE_NAME, KEY_TESTS, KEY_COLUMNS, \
+    COLUMN_KEY_VALID_FORMAT
+from sodasql.scan.warehouse import Warehouse
+from sodasql.scan.warehouse_yml import WarehouseYml
+from tests.common.sql_test_case import SqlTestCase
+
+
+class TestScanBatch(SqlTestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.other_table_name = f'{self.default_test_table_name}_other'
+        self.sql_recreate_table(
+            [f"name {self.dialect.data_type_varchar_255}",
+             f"size {self.dialect.data_type_integer}"],
+            ["('one', 1)",
+             "('two', 2)",
+             "('three', 3)",
+             "(null, null)"])
+        self.sql_recreate_table(
+            [f"email {self.dialect.data_type_varchar_255}"],
+            ["('info@example.com')",
+             "('invalid')"],
+            table_name=self.other_table_name)
+
+    def create_scans(self, warehouse: Warehouse):
+        scan_yml_dicts = [{
+            KEY_TABLE_NAME: self.default_test_table_name,
+            KEY_METRICS: [Metric.ROW_COUNT, Metric.MISSING_COUNT, Metric.MIN, Metric.MAX, Metric.AVG_LENGTH],
+            KEY_TESTS: ['row_count == 4']
+        }, {
+            KEY_TABLE_NAME: self.other_table_name,
+            KEY_METRICS: [Metric.ROW_COUNT, Metric.INVALID_COUNT],
+            KEY_COLUMNS: {
+                'email': {
+                    COLUMN_KEY_VALID_FORMAT: 'email'
+                }
+            }
+        }]
+        scans = []
+        for scan_yml_dict in scan_yml_dicts:
+            scan_yml_parser = ScanYmlParser(scan_yml_dict, 'test-scan')
+            scan_yml_parser.assert_no_warnings_or_errors()
+            scans.append(warehouse.create_scan(scan_yml=scan_yml_parser.scan_yml))
+        return scans
+
+    @staticmethod
+    def summarize(scan_result):
+        return ([str(measurement) for measurement in scan_result.measurements],
+                [(test_result.test.expression, test_result.passed) for test_result in scan_result.test_results],
+                scan_result.errors)
+
+    def build_scans(self, dialects):
+        scans = []
+        for table_name, dialect in zip([self.default_test_table_name, self.other_table_name], dialects):
+            scan_builder = ScanBuilder()
+            scan_builder.warehouse_yml = WarehouseYml(dialect=dialect, name=self.warehouse_fixture.warehouse_yml.name)
+            scan_builder.scan_yml_dict = {
+                KEY_TABLE_NAME: table_name,
+                KEY_METRICS: [Metric.ROW_COUNT]
+            }
+            scans.append(scan_builder.build())
+        return scans
+
+    @staticmethod
+    def run_scan_batch(scans):
+        sql_fetchall = Warehouse.sql_fetchall
+        with patch.object(Warehouse, 'sql_fetchall', autospec=True, side_effect=sql_fetchall) as fetchall:
+            scan_results = ScanBatch(scans).run()
+        return scan_results, [fetchall_call.args[1] for fetchall_call in fetchall.call_args_list]
+
+    def test_scan_batch_results_equal_scan_results(self):
+        scan_results = []
+        for scan in self.create_scans(self.warehouse):
+            scan.close_warehouse = False
+            scan_results.append(scan.execute())
+
+        warehouse = Warehouse(self.warehouse_fixture.warehouse_yml)
+        batch_scan_results = ScanBatch(self.create_scans(warehouse)).run()
+
+        self.assertEqual([self.summarize(scan_result) for scan_result in scan_results],
+                         [self.summarize(scan_result) for scan_result in batch_scan_results])
+        self.assertEqual(4, batch_scan_results[0].get(Metric.ROW_COUNT))
+        self.assertEqual(1, batch_scan_results[1].get(Metric.INVALID_COUNT, 'email'))
+
+    def test_scan_batch_closes_shared_warehouse_once(self):
+        warehouse = Warehouse(self.warehouse_fixture.warehouse_yml)
+        scans = self.create_scans(warehouse)
+
+        with patch.object(warehouse, 'close', wraps=warehouse.close) as close:
+            ScanBatch(scans).run()
+
+        self.assertEqual(1, close.call_count)
+
+    def test_scan_batch_prefetches_columns_metadata_of_built_scans(self):
+        if not self.dialect.sql_all_columns_metadata_query():
+            self.skipTest(f'{self.target} does not support prefetching the column metadata')
+
+        scans = self.build_scans([self.dialect, self.dialect])
+        self.assertIsNot(scans[0].warehouse, scans[1].warehouse)
+
+        scan_results, sqls = self.run_scan_batch(scans)
+
+        all_columns_metadata_sql = self.dialect.sql_all_columns_metadata_query(
+            [self.default_test_table_name, self.other_table_name])
+        self.assertEqual(1, sqls.count(all_columns_metadata_sql))
+        self.assertNotIn(self.dialect.sql_columns_metadata_query(self.default_test_table_name), sqls)
+        self.assertNotIn(self.dialect.sql_columns_metadata_query(self.other_table_name), sqls)
+        self.assertEqual([4, 2], [scan_result.get(Metric.ROW_COUNT) for scan_result in scan_results])
+        self.assertEqual(['name', 'size'],
+                         [column['name'] for column in scan_results[0].get(Metric.SCHEMA)])
+        self.assertTrue(all(scan.warehouse.columns_metadata_by_table is None for scan in scans))
+
+    def test_scan_batch_does_not_share_columns_metadata_of_other_databases(self):
+        if not self.dialect.sql_all_columns_metadata_query():
+            self.skipTest(f'{self.target} does not support prefetching the column metadata')
+
+        other_dialect = copy.copy(self.dialect)
+        scans = self.build_scans([self.dialect, other_dialect])
+
+        with patch.object(other_dialect, 'connection_key', return_value=('other_database',)):
+            scan_results, sqls = self.run_scan_batch(scans)
+
+        self.assertFalse(any(scan.warehouse.columns_metadata_by_table for scan in scans))
+        self.assertIn(self.dialect.sql_columns_metadata_query(self.default_test_table_name), sqls)
+        self.assertIn(self.dialect.sql_columns_metadata_query(self.other_table_name), sqls)
+        self.assertEqual([4, 2], [scan_result.get(Metric.ROW_COUNT) for scan_result in scan_results])
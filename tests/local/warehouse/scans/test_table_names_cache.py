@@ -0,0 +1,53 @@
+#  Copyright 2020 Soda
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#   http://www.apache.org/licenses/LICENSE-2.0
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+from unittest.mock import patch
+
+from sodasql.scan.warehouse import TABLE_NAMES_CACHE_TTL_SECONDS
+from tests.common.sql_test_case import SqlTestCase
+
+
+class TestTableNamesCache(SqlTestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.sql_recreate_table([f"name {self.dialect.data_type_varchar_255}"])
+        self.warehouse.refresh_metadata()
+
+    def tearDown(self) -> None:
+        self.warehouse.table_names_cache_ttl_seconds = TABLE_NAMES_CACHE_TTL_SECONDS
+        self.warehouse.refresh_metadata()
+        super().tearDown()
+
+    def get_table_names(self):
+        with patch.object(self.warehouse, 'sql_fetchall', wraps=self.warehouse.sql_fetchall) as sql_fetchall:
+            table_names = self.warehouse.get_table_names()
+        return [table_name.lower() for table_name in table_names], sql_fetchall.call_count
+
+    def test_table_names_cached(self):
+        table_names, query_count = self.get_table_names()
+        self.assertIn(self.default_test_table_name, table_names)
+        self.assertEqual(1, query_count)
+
+        self.assertEqual((table_names, 0), self.get_table_names())
+
+    def test_table_names_cache_expires(self):
+        self.warehouse.table_names_cache_ttl_seconds = 0
+        self.get_table_names()
+
+        _, query_count = self.get_table_names()
+        self.assertEqual(1, query_count)
+
+    def test_refresh_metadata_drops_table_names(self):
+        self.get_table_names()
+        self.warehouse.refresh_metadata()
+
+        _, query_count = self.get_table_names()
+        self.assertEqual(1, query_count)